@@ -0,0 +1,176 @@
+# analytics_view.py
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+    QTableWidgetItem, QHeaderView, QMessageBox, QTabWidget, QDateEdit, QSpinBox
+)
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QDate
+
+import global_state
+import attendance_analytics as analytics
+from attendance_db import user_id
+from data_service import DataService
+
+
+class AnalyticsWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("📈 Attendance Analytics - Teacher Panel")
+        self.setGeometry(220, 90, 900, 700)
+
+        self.setStyleSheet("""
+            QWidget {
+                background: qlineargradient(
+                    x1: 0, y1: 0, x2: 1, y2: 1,
+                    stop: 0 #e3f2fd, stop: 1 #bbdefb
+                );
+                font-family: 'Segoe UI';
+            }
+            QLabel { color: #0d47a1; }
+            QDateEdit, QSpinBox {
+                padding: 8px;
+                border-radius: 8px;
+                border: 1px solid #ccc;
+                background-color: white;
+                font-size: 14px;
+            }
+            QPushButton {
+                background-color: #1e88e5;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 10px;
+                font-size: 15px;
+                border: none;
+            }
+            QPushButton:hover { background-color: #0d47a1; }
+            QTableWidget {
+                background-color: #ffffff;
+                alternate-background-color: #f1f8ff;
+                border: 1px solid #ccc;
+                gridline-color: #90caf9;
+                font-size: 14px;
+            }
+            QHeaderView::section {
+                background-color: #1565c0;
+                color: white;
+                font-weight: bold;
+                border: none;
+                padding: 8px;
+            }
+        """)
+
+        self.service = DataService(self)
+        self.initUI()
+
+    # -------------------- UI SETUP --------------------
+    def initUI(self):
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignTop)
+        layout.setContentsMargins(40, 30, 40, 30)
+        layout.setSpacing(15)
+
+        title = QLabel("📈 Attendance Analytics")
+        title.setFont(QFont("Segoe UI", 22, QFont.Bold))
+        title.setAlignment(Qt.AlignCenter)
+
+        # Period and defaulter threshold
+        controls = QHBoxLayout()
+        controls.setAlignment(Qt.AlignCenter)
+        controls.setSpacing(15)
+
+        self.since = QDateEdit(QDate.currentDate().addDays(-90))
+        self.since.setCalendarPopup(True)
+        self.since.setDisplayFormat("yyyy-MM-dd")
+
+        self.threshold = QSpinBox()
+        self.threshold.setRange(1, 100)
+        self.threshold.setValue(75)
+        self.threshold.setSuffix(" %")
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.load_data)
+
+        controls.addWidget(QLabel("From:"))
+        controls.addWidget(self.since)
+        controls.addWidget(QLabel("Defaulters below:"))
+        controls.addWidget(self.threshold)
+        controls.addWidget(refresh_btn)
+
+        self.tabs = QTabWidget()
+        self.subject_table = self.add_table("Subjects", ["Subject", "Present", "Total", "Rate %"])
+        self.daily_table = self.add_table("Daily Headcount", ["Date", "Present", "Total"])
+        self.trend_table = self.add_table("30-Day Trend", ["Date", "Rolling Rate %"])
+        self.defaulter_table = self.add_table("Defaulters", ["Student", "Present", "Total", "Rate %"])
+
+        layout.addWidget(title)
+        layout.addLayout(controls)
+        layout.addWidget(self.tabs)
+        self.setLayout(layout)
+
+        self.load_data()
+
+    def add_table(self, label, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setAlternatingRowColors(True)
+        self.tabs.addTab(table, label)
+        return table
+
+    # -------------------- LOAD --------------------
+    def load_data(self):
+        """Fill every tab in the background; unchanged attendance is answered from the cache."""
+        since = self.since.date().toString("yyyy-MM-dd")
+        teacher_name = global_state.current_teacher or "Unknown Teacher"
+        threshold = float(self.threshold.value())
+
+        def work(conn):
+            cur = conn.cursor()
+            teacher_id = user_id(cur, teacher_name)
+            cache = analytics.cache
+            return (
+                cache.get(cur, analytics.subject_rates, teacher_id, since),
+                cache.get(cur, analytics.daily_headcounts, teacher_id, since),
+                cache.get(cur, analytics.rolling_trend, teacher_id, since),
+                cache.get(cur, analytics.defaulters, since, threshold),
+            )
+
+        self.service.run("analytics", work, self.show_results, self.show_error)
+
+    def show_results(self, results):
+        tables = (self.subject_table, self.daily_table, self.trend_table, self.defaulter_table)
+        for table, data in zip(tables, results):
+            self.populate(table, data)
+
+    def show_error(self, error):
+        QMessageBox.critical(self, "Error", f"Database error: {str(error)}")
+
+    def populate(self, table, data):
+        # Results are aggregates, at most a few hundred rows
+        table.setRowCount(len(data))
+        for row_num, row_data in enumerate(data):
+            for col_num, value in enumerate(row_data):
+                item = QTableWidgetItem(str(value))
+                item.setTextAlignment(Qt.AlignCenter)
+                table.setItem(row_num, col_num, item)
+
+    def closeEvent(self, event):
+        self.service.cancel()
+        super().closeEvent(event)
+
+
+# -------------------- Run Directly --------------------
+if __name__ == "__main__":
+    from PyQt5.QtWidgets import QApplication
+    import sys
+    from db__initializer import ensure_databases
+
+    # For test
+    global_state.current_teacher = "DemoTeacher"
+    ensure_databases()
+
+    app = QApplication(sys.argv)
+    window = AnalyticsWindow()
+    window.show()
+    sys.exit(app.exec_())
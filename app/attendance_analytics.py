@@ -0,0 +1,118 @@
+# attendance_analytics.py
+# Attendance summaries computed in SQL for the reports screens. Teacher
+# queries read attendance through the covering ix_attendance_teacher_date
+# index; school-wide ones read the trigger-maintained attendance_summary.
+import threading
+
+
+def attendance_version(cursor):
+    """Counter bumped by triggers on every attendance insert, update or delete."""
+    cursor.execute("SELECT version FROM data_versions WHERE name = 'attendance'")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def subject_rates(cursor, teacher_id, since):
+    """[(subject, present, total, rate %), ...] for a teacher's classes since a date."""
+    cursor.execute("""
+        SELECT sub.name, SUM(a.status = 'Present'), COUNT(*),
+               ROUND(100.0 * SUM(a.status = 'Present') / COUNT(*), 1)
+        FROM attendance a
+        JOIN subjects sub ON sub.id = a.subject_id
+        WHERE a.teacher_id = ? AND a.date >= ?
+        GROUP BY a.subject_id
+        ORDER BY sub.name
+    """, (teacher_id, since))
+    return cursor.fetchall()
+
+
+def daily_headcounts(cursor, teacher_id, since):
+    """[(date, present, total), ...] for each day a teacher took attendance since a date."""
+    cursor.execute("""
+        SELECT date, SUM(status = 'Present'), COUNT(*)
+        FROM attendance
+        WHERE teacher_id = ? AND date >= ?
+        GROUP BY date
+        ORDER BY date
+    """, (teacher_id, since))
+    return cursor.fetchall()
+
+
+def rolling_trend(cursor, teacher_id, since, days=30):
+    """
+    [(date, rolling rate %), ...]: for each class day since `since`, the
+    present rate over the `days` calendar days ending that day.
+    """
+    days = int(days)
+    cursor.execute(f"""
+        SELECT date, rate FROM (
+            SELECT date,
+                   ROUND(100.0 * SUM(present) OVER w / SUM(total) OVER w, 1) AS rate
+            FROM (
+                SELECT date, SUM(status = 'Present') AS present, COUNT(*) AS total
+                FROM attendance
+                WHERE teacher_id = ? AND date >= date(?, '-{days - 1} days')
+                GROUP BY date
+            )
+            WINDOW w AS (ORDER BY julianday(date) RANGE BETWEEN {days - 1} PRECEDING AND CURRENT ROW)
+        )
+        WHERE date >= ?
+        ORDER BY date
+    """, (teacher_id, since, since))
+    return cursor.fetchall()
+
+
+def defaulters(cursor, since, threshold=75.0):
+    """
+    [(student, present, total, rate %), ...] for every active student whose rate
+    since the start of `since`'s month is below `threshold` percent,
+    lowest first. Reads attendance_summary, so it covers the whole school.
+    """
+    cursor.execute("""
+        SELECT u.username, SUM(sm.present), SUM(sm.total),
+               ROUND(100.0 * SUM(sm.present) / SUM(sm.total), 1) AS rate
+        FROM attendance_summary sm
+        JOIN users u ON u.id = sm.student_id
+        WHERE sm.month >= substr(?, 1, 7) AND u.active = 1
+        GROUP BY sm.student_id
+        HAVING SUM(sm.total) > 0 AND 100.0 * SUM(sm.present) < ? * SUM(sm.total)
+        ORDER BY rate, u.username
+    """, (since, threshold))
+    return cursor.fetchall()
+
+
+class AnalyticsCache:
+    """
+    Remembers query results until attendance changes. Checking costs one
+    primary-key lookup of the trigger-maintained version counter, so
+    marks written by any window or by face_module.py invalidate it.
+    Safe to share between the data service's pool threads.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def get(self, cursor, query, *args):
+        # The lock guards only the dict; queries run outside it so windows
+        # on different pool threads do not wait on each other
+        version = attendance_version(cursor)
+        key = (query.__name__, args)
+        with self.lock:
+            if version != self.version:
+                self.results = {}
+                self.version = version
+            if key in self.results:
+                return self.results[key]
+
+        result = query(cursor, *args)
+        with self.lock:
+            # Not kept if attendance changed while the query ran
+            if self.version == version:
+                self.results[key] = result
+        return result
+
+
+# Shared by every analytics window in the process
+cache = AnalyticsCache()
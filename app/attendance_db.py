@@ -0,0 +1,112 @@
+# attendance_db.py
+import re
+# One attendance row per student, subject and day. Writing the same mark
+# again is a no-op; a changed status or teacher updates the row in place.
+UPSERT_ATTENDANCE = """
+    INSERT INTO attendance (student_id, roll_number, date, subject_id, teacher_id, status)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(student_id, subject_id, date) DO UPDATE SET
+        roll_number = COALESCE(excluded.roll_number, attendance.roll_number),
+        teacher_id = excluded.teacher_id,
+        status = excluded.status
+    WHERE attendance.status IS NOT excluded.status
+       OR attendance.teacher_id IS NOT excluded.teacher_id
+"""
+
+# Attendance rows with names resolved, for display
+ATTENDANCE_FROM = """
+    FROM attendance a
+    JOIN users s ON s.id = a.student_id
+    JOIN subjects sub ON sub.id = a.subject_id
+    LEFT JOIN users t ON t.id = a.teacher_id
+"""
+ATTENDANCE_ROWS = """
+    SELECT a.roll_number, s.username, a.date, sub.name, t.username, a.status
+""" + ATTENDANCE_FROM
+
+# The same rows ending in the (date, id) key that QueryTableModel pages on
+PAGE_KEY = ("a.date", "a.id")
+ATTENDANCE_PAGE_ROWS = """
+    SELECT a.roll_number, s.username, a.date, sub.name, t.username, a.status, a.date, a.id
+""" + ATTENDANCE_FROM
+
+
+# A search term made only of digits and dashes is (part of) a date
+DATE_TERM = re.compile(r"\d[\d-]*$")
+
+
+def search_clause(keyword):
+    """
+    Turn a search box keyword into (sql, params) to AND onto an
+    ATTENDANCE_ROWS query. Date terms such as 2025, 2025-03 or 2025-03-1
+    become a range on the indexed date column; every other word must
+    prefix-match the student, subject or teacher name in attendance_fts.
+    """
+    sql, params, words = "", [], []
+    for term in keyword.split():
+        if DATE_TERM.match(term):
+            # Every date starting with the term sorts between it and term + "~"
+            sql += " AND a.date >= ? AND a.date < ?"
+            params += [term, term + "~"]
+        else:
+            words.append('"' + term.replace('"', '""') + '"*')
+    if words:
+        sql += " AND a.id IN (SELECT rowid FROM attendance_fts WHERE attendance_fts MATCH ?)"
+        params.append(" ".join(words))
+    return sql, params
+
+
+def attendance_totals(cursor, student_id):
+    """(present, total) classes for a student, from the summary table."""
+    cursor.execute("""
+        SELECT COALESCE(SUM(present), 0), COALESCE(SUM(total), 0)
+        FROM attendance_summary WHERE student_id = ?
+    """, (student_id,))
+    return cursor.fetchone()
+
+
+def subject_breakdown(cursor, student_id):
+    """
+    [(subject, present, total), ...] for a student, from the summary table.
+    Subjects whose rows were all deleted or moved keep a summary row at
+    total 0; they are left out.
+    """
+    cursor.execute("""
+        SELECT sub.name, SUM(sm.present), SUM(sm.total)
+        FROM attendance_summary sm
+        JOIN subjects sub ON sub.id = sm.subject_id
+        WHERE sm.student_id = ?
+        GROUP BY sm.subject_id
+        HAVING SUM(sm.total) > 0
+        ORDER BY sub.name
+    """, (student_id,))
+    return cursor.fetchall()
+
+
+def upsert_attendance(cursor, rows):
+    """
+    Write (student_id, roll_number, date, subject_id, teacher_id, status) rows.
+    Returns the number of rows that were inserted or actually changed.
+    """
+    cursor.executemany(UPSERT_ATTENDANCE, rows)
+    return max(cursor.rowcount, 0)
+
+
+def user_id(cursor, username):
+    """ID of a user by name, or None if there is no such account."""
+    cursor.execute("SELECT id FROM users WHERE username=?", (username,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def student_ids(cursor):
+    """Map of every active student's username to their ID."""
+    cursor.execute("SELECT username, id FROM users WHERE role='Student' AND active=1")
+    return dict(cursor.fetchall())
+
+
+def subject_id(cursor, name):
+    """ID of a subject, adding it to the subjects table on first use."""
+    cursor.execute("INSERT OR IGNORE INTO subjects (name) VALUES (?)", (name,))
+    cursor.execute("SELECT id FROM subjects WHERE name=?", (name,))
+    return cursor.fetchone()[0]
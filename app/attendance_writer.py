@@ -0,0 +1,101 @@
+# attendance_writer.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+import database
+from attendance_db import UPSERT_ATTENDANCE
+
+
+class AttendanceWriter:
+    """
+    Write-behind attendance writer.
+
+    Mark events are queued from any thread and written by one background
+    thread that keeps a single long-lived connection. Events are flushed in
+    one transaction every `batch_size` events or `flush_interval` seconds,
+    whichever comes first. `submit` returns a Future that resolves to True
+    if the mark was new and False if the student was already marked Present.
+    Submitting after `close` raises RuntimeError rather than queueing a
+    mark nobody would write.
+    """
+
+    def __init__(self, batch_size=20, flush_interval=0.2):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.events = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.closing = threading.Event()
+        self.submit_lock = threading.Lock()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, student_id, subject_id, teacher_id, date=None):
+        future = Future()
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        # Checked and queued together, so nothing lands after the last flush
+        with self.submit_lock:
+            if self.closing.is_set():
+                raise RuntimeError("Attendance writer is closed; mark not saved.")
+            self.events.put((student_id, subject_id, teacher_id, date, future))
+        return future
+
+    def close(self):
+        """Flush everything still queued, then stop the writer thread."""
+        with self.submit_lock:
+            self.closing.set()
+        self.thread.join()
+
+    # -------------------- WRITER THREAD --------------------
+    def run(self):
+        # The connection must live on the thread that uses it
+        conn = database.connection()
+        try:
+            while not (self.closing.is_set() and self.events.empty()):
+                batch = self.collect_batch()
+                if batch:
+                    self.flush(conn, batch)
+        finally:
+            database.close_connection()
+
+    def collect_batch(self):
+        """Wait for the first event, then gather more until the batch is full or due."""
+        try:
+            batch = [self.events.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.events.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, conn, batch):
+        cursor = conn.cursor()
+        results = []
+        try:
+            for student_id, subject_id, teacher_id, date, future in batch:
+                cursor.execute(UPSERT_ATTENDANCE,
+                               (student_id, None, date, subject_id, teacher_id, "Present"))
+                # rowcount is 0 when the student was already marked Present
+                results.append((future, cursor.rowcount > 0))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            for *_, future in batch:
+                future.set_exception(e)
+            print(f"⚠️ Failed to write attendance: {str(e)}")
+            return
+
+        for future, is_new in results:
+            future.set_result(is_new)
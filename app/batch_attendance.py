@@ -0,0 +1,152 @@
+# batch_attendance.py
+import argparse
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import cv2
+
+# Suppress TensorFlow logs (must be set before DeepFace imports TensorFlow)
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+
+from face_gallery import FaceGallery, IMAGE_EXTENSIONS
+from face_detector import create_detector
+from face_module import STUDENT_IMAGES_DIR, DEFAULT_DETECTOR, mark_attendance_bulk
+from db__initializer import init_databases
+
+# Constants
+DEFAULT_STRIDE = 15         # every 15th video frame, about 2 per second at 30 FPS
+
+# Per-process state, set up once by init_worker
+_gallery = None
+_detector = None
+
+
+def init_worker(images_dir, detector):
+    global _gallery, _detector
+    _gallery = FaceGallery(images_dir, detector=detector).load()
+    _detector = create_detector(detector)
+
+
+def recognize_frame(frame):
+    """Return the set of student names recognized in one frame."""
+    if isinstance(frame, str):
+        frame = cv2.imread(frame)
+        if frame is None:
+            return set()
+
+    faces = _detector.detect(frame)
+    crops = [frame[y:y + h, x:x + w] for (x, y, w, h) in faces]
+    crops = [crop for crop in crops if crop.size]
+    matches = _gallery.match_many(_gallery.embed(crops))
+    return {name for name, _ in matches if name is not None}
+
+
+def iter_frames(source, stride):
+    """
+    Yield the work items for a source: image paths for a folder,
+    every `stride`-th decoded frame for a video file.
+    """
+    if os.path.isdir(source):
+        for file_name in sorted(os.listdir(source)):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(source, file_name)
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {source}")
+
+    index = 0
+    while True:
+        # grab() skips the colour conversion of frames we are not going to use
+        if not cap.grab():
+            break
+        if index % stride == 0:
+            ret, frame = cap.retrieve()
+            if ret:
+                yield frame
+        index += 1
+    cap.release()
+
+
+def recognize_source(source, stride=DEFAULT_STRIDE, workers=None,
+                     images_dir=STUDENT_IMAGES_DIR, detector=DEFAULT_DETECTOR):
+    """
+    Recognize every student who appears in a video or image folder.
+    Frames are spread over a process pool; at most two frames per worker
+    are in flight so memory stays bounded on long recordings.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    # Bring the embedding store up to date once, before the workers read it
+    FaceGallery(images_dir, detector=detector).load()
+
+    present = set()
+    processed = failed = 0
+
+    def collect(future):
+        # One bad frame should not throw away everyone already recognized
+        nonlocal processed, failed
+        try:
+            present.update(future.result())
+            processed += 1
+        except Exception as e:
+            failed += 1
+            print(f"⚠️ Skipped a frame: {str(e)}")
+
+    # "spawn" gives every worker a clean TensorFlow runtime
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=init_worker, initargs=(images_dir, detector)) as pool:
+        pending = set()
+        for frame in iter_frames(source, stride):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            pending.add(pool.submit(recognize_frame, frame))
+
+        for future in pending:
+            collect(future)
+
+    print(f"🎞️ Processed {processed} frame(s) from {source}, {len(present)} student(s) recognized.")
+    if failed:
+        print(f"⚠️ {failed} frame(s) could not be processed.")
+    return present
+
+
+def source_date(source):
+    """Date the recording was made, taken from the file's modification time."""
+    return datetime.fromtimestamp(os.path.getmtime(source)).strftime("%Y-%m-%d")
+
+
+# ------------------- ENTRY POINT -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mark attendance from a recorded lecture video or a folder of class photos."
+    )
+    parser.add_argument("source", help="video file or folder of images")
+    parser.add_argument("subject")
+    parser.add_argument("teacher_name")
+    parser.add_argument("--stride", type=int, default=DEFAULT_STRIDE,
+                        help="process every N-th video frame (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("--detector", default=DEFAULT_DETECTOR,
+                        help="face detector backend: haar, lbp, yunet or ssd (default: %(default)s)")
+    parser.add_argument("--date", default=None,
+                        help="attendance date YYYY-MM-DD (default: the source's modification date)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"❌ Source not found: {args.source}")
+        sys.exit(1)
+
+    names = recognize_source(args.source, max(1, args.stride), args.workers,
+                             detector=args.detector)
+    date = args.date or source_date(args.source)
+    init_databases()
+    mark_attendance_bulk(names, args.subject, args.teacher_name, date)
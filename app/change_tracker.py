@@ -0,0 +1,23 @@
+# change_tracker.py
+
+
+class ChangeTracker:
+    """
+    Remembers the last saved value of each row, keyed by ID, so a window
+    can write only the rows the user actually changed.
+    """
+
+    def __init__(self):
+        self.saved = {}
+
+    def load(self, values):
+        """Reset to the values just read from the database."""
+        self.saved = dict(values)
+
+    def changes(self, current):
+        """Rows in `current` whose value differs from the saved one, or were never saved."""
+        return {key: value for key, value in current.items()
+                if key not in self.saved or self.saved[key] != value}
+
+    def mark_saved(self, changes):
+        self.saved.update(changes)
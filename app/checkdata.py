@@ -1,28 +1,20 @@
-import sqlite3
+import database
 
-# Check login DB
-conn = sqlite3.connect('logindata.db')
+conn = database.connection()
 cur = conn.cursor()
-print("📘 Tables in logindata.db:")
+print(f"📘 Tables in {database.DB_PATH}:")
 cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
 print(cur.fetchall())
 
-cur.execute("PRAGMA table_info(users)")
-print("🧩 Columns in users table:")
-print([col[1] for col in cur.fetchall()])
-conn.close()
+for table in ("users", "attendance", "student_status"):
+    cur.execute(f"PRAGMA table_info({table})")
+    print(f"🧩 Columns in {table} table:")
+    print([col[1] for col in cur.fetchall()])
 
-
-# Check attendance DB
-conn = sqlite3.connect("attendance.db")
-cur = conn.cursor()
-print("\n📗 Tables in attendance.db:")
-cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
-print(cur.fetchall())
-
-cur.execute("PRAGMA table_info(attendance)")
-print("🧩 Columns in attendance table:")
-print([col[1] for col in cur.fetchall()])
-conn.close()
+cur.execute("PRAGMA journal_mode")
+print(f"\n📓 Journal mode: {cur.fetchone()[0]}")
+cur.execute("PRAGMA foreign_key_check")
+problems = cur.fetchall()
+print(f"🔗 Foreign key problems: {len(problems)}")
 
 print("\n✅ Database structure verified successfully!")
@@ -0,0 +1,115 @@
+# data_service.py
+import sqlite3
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import database
+
+# SQLite calls the progress handler every this many VM instructions; it is
+# where a superseded query notices it should stop
+CANCEL_CHECK_STEPS = 1000
+
+# Long exports run on their own small pool, so they never hold the shared
+# pool's threads that every window's queries use
+EXPORT_THREADS = 1
+_export_pool = None
+
+
+def export_pool():
+    global _export_pool
+    if _export_pool is None:
+        _export_pool = QThreadPool()
+        _export_pool.setMaxThreadCount(EXPORT_THREADS)
+    return _export_pool
+
+
+class QueryTask(QRunnable):
+    """Runs one piece of database work on a pool thread."""
+
+    def __init__(self, service, key, generation, work):
+        super().__init__()
+        self.service = service
+        self.key = key
+        self.generation = generation
+        self.work = work
+
+    def cancelled(self):
+        return not self.service.is_current(self.key, self.generation)
+
+    def run(self):
+        if self.cancelled():
+            return
+        # Pool threads are reused, so each keeps its own pooled connection
+        conn = database.connection()
+        conn.set_progress_handler(self.cancelled, CANCEL_CHECK_STEPS)
+        result = error = None
+        try:
+            result = self.work(conn)
+        except sqlite3.OperationalError as e:
+            if self.cancelled():
+                # Interrupted by the progress handler; nobody wants the result
+                conn.rollback()
+                return
+            error = e
+        except Exception as e:
+            error = e
+        finally:
+            conn.set_progress_handler(None, 0)
+
+        try:
+            self.service.done.emit(self.key, self.generation, result, error)
+        except RuntimeError:
+            pass    # the window that asked was closed and its service deleted
+
+
+class DataService(QObject):
+    """
+    Runs database queries off the GUI thread on the shared QThreadPool and
+    delivers results back on the GUI thread.
+
+    Each request has a key. Starting a new request with the same key
+    supersedes the old one: a query still running is interrupted, and a
+    result that already arrived is dropped, so a window only ever sees the
+    answer to the latest thing it asked for.
+
+    Work runs on the application's global QThreadPool unless another
+    `pool` is given, e.g. export_pool() for long-running exports.
+    """
+
+    done = pyqtSignal(object, int, object, object)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.generations = {}
+        self.callbacks = {}
+        self.done.connect(self.deliver)
+
+    def run(self, key, work, on_result, on_error=None):
+        """Call work(conn) in the background, then on_result(result) or on_error(exception)."""
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        self.callbacks[key] = (on_result, on_error)
+        self.pool.start(QueryTask(self, key, generation, work))
+
+    def is_current(self, key, generation):
+        return self.generations.get(key) == generation
+
+    def is_busy(self, key):
+        return key in self.callbacks
+
+    def cancel(self, key=None):
+        """Abandon one request, or all of them, e.g. when a window closes."""
+        keys = [key] if key is not None else list(self.generations)
+        for k in keys:
+            self.generations[k] = self.generations.get(k, 0) + 1
+            self.callbacks.pop(k, None)
+
+    def deliver(self, key, generation, result, error):
+        if not self.is_current(key, generation):
+            return
+        on_result, on_error = self.callbacks.pop(key)
+        if error is None:
+            on_result(result)
+        elif on_error is not None:
+            on_error(error)
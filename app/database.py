@@ -0,0 +1,48 @@
+# database.py
+import sqlite3
+import threading
+
+# Users, attendance and student status all live in this one file
+DB_PATH = "school.db"
+
+# Wait this long for another process (e.g. face_module.py) to release its
+# write lock instead of failing with "database is locked"
+BUSY_TIMEOUT = 10.0
+
+# WAL lets the GUI read while the recognition process writes, and makes
+# commits cheaper. It needs shared memory between processes, so a copy of
+# the app run straight from a network share should set this to "DELETE".
+JOURNAL_MODE = "WAL"
+
+_local = threading.local()
+
+
+def open_connection(db_path=DB_PATH):
+    """Open a new connection with the app's pragmas applied."""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}")
+    # WAL is crash-safe at NORMAL; only the last commit may be lost on power failure
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def connection():
+    """
+    This thread's shared connection, opened on first use and kept for the
+    life of the thread. Callers must not close it; commit writes with
+    `with connection() as conn:` so a failed write is rolled back and does
+    not leave the shared connection holding the write lock.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = open_connection()
+    return conn
+
+
+def close_connection():
+    """Close this thread's shared connection, e.g. when a worker thread exits."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
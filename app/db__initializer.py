@@ -1,61 +1,530 @@
 import os
-import sqlite3
+import threading
 
-def init_databases():
-    # ---------- 1️⃣ LOGIN DATABASE ----------
-    if not os.path.exists("logindata.db"):
-        conn = sqlite3.connect("logindata.db")
-        cur = conn.cursor()
+from database import DB_PATH
+from migrations import migrate, add_column_if_missing, schema_version
+
+
+# ---------- 1️⃣ LOGIN DATABASE ----------
+def create_users(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT CHECK(role IN ('Student', 'Teacher')) NOT NULL,
+            roll_number INTEGER
+        )
+    """)
+
+
+def add_user_id(cur):
+    add_column_if_missing(cur, "users", "user_id", "TEXT")
+
+
+def create_student_info_tables(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS meals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT,
+            date TEXT,
+            status TEXT
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS goods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT,
+            uniform_received TEXT,
+            books_received TEXT,
+            issue_year INTEGER
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS academics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT,
+            subject TEXT,
+            marks INTEGER,
+            term TEXT
+        )
+    """)
+
+
+LOGIN_MIGRATIONS = [
+    create_users,
+    add_user_id,
+    create_student_info_tables,
+]
+
+
+# ---------- 2️⃣ ATTENDANCE DATABASE ----------
+def create_attendance(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT NOT NULL,
+            roll_number INTEGER,
+            date TEXT NOT NULL,
+            subject TEXT NOT NULL DEFAULT 'General',
+            teacher_name TEXT,
+            status TEXT CHECK(status IN ('Present', 'Absent')) NOT NULL
+        )
+    """)
+    # Tables made by the old logindatafill.py script lack these columns
+    add_column_if_missing(cur, "attendance", "roll_number", "INTEGER")
+    add_column_if_missing(cur, "attendance", "subject", "TEXT NOT NULL DEFAULT 'General'")
+    add_column_if_missing(cur, "attendance", "teacher_name", "TEXT")
+
+
+def unique_attendance(cur):
+    """
+    Collapse duplicate (student, subject, date) rows, keeping the most
+    recently written one, and add the unique key the upsert relies on.
+    """
+    cur.execute("""
+        DELETE FROM attendance
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM attendance
+            GROUP BY student_name, subject, date
+        )
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_student_subject_date
+        ON attendance (student_name, subject, date)
+    """)
+
+
+def attendance_indexes(cur):
+    # ViewReportsWindow: WHERE teacher_name = ? ORDER BY date DESC
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_attendance_teacher_date
+        ON attendance (teacher_name, date, roll_number, student_name, subject, status)
+    """)
+    # StudentViewAttendance: WHERE student_name = ? ORDER BY date DESC
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_attendance_student_date
+        ON attendance (student_name, date, subject, teacher_name, status)
+    """)
+    # MarkAttendanceWindow.refresh_attendance: WHERE date = ? AND subject = ?
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_attendance_date_subject
+        ON attendance (date, subject, student_name, status)
+    """)
+
+
+def normalize_attendance(cur):
+    """
+    Replace free-text student, teacher and subject names with integer IDs.
+    Names with no account get a placeholder user (empty password, so it
+    cannot log in) so that no attendance history is lost; add_user_active
+    later marks these inactive so they stay off every roster.
+    Student and teacher IDs point at users.id in logindata.db; SQLite cannot
+    enforce a foreign key across database files.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        )
+    """)
+    cur.execute("INSERT OR IGNORE INTO subjects (name) SELECT DISTINCT subject FROM attendance")
+
+    cur.execute("""
+        INSERT OR IGNORE INTO login.users (username, password, role)
+        SELECT DISTINCT student_name, '', 'Student' FROM attendance
+    """)
+    cur.execute("""
+        INSERT OR IGNORE INTO login.users (username, password, role)
+        SELECT DISTINCT teacher_name, '', 'Teacher' FROM attendance
+        WHERE teacher_name IS NOT NULL AND teacher_name <> 'Unknown Teacher'
+    """)
+
+    cur.execute("""
+        CREATE TABLE attendance_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            roll_number INTEGER,
+            date TEXT NOT NULL,
+            subject_id INTEGER NOT NULL REFERENCES subjects(id),
+            teacher_id INTEGER,
+            status TEXT CHECK(status IN ('Present', 'Absent')) NOT NULL
+        )
+    """)
+    cur.execute("""
+        INSERT INTO attendance_new (id, student_id, roll_number, date, subject_id, teacher_id, status)
+        SELECT a.id, s.id, a.roll_number, a.date, sub.id, t.id, a.status
+        FROM attendance a
+        JOIN login.users s ON s.username = a.student_name
+        JOIN subjects sub ON sub.name = a.subject
+        LEFT JOIN login.users t ON t.username = a.teacher_name
+    """)
+    cur.execute("DROP TABLE attendance")
+    cur.execute("ALTER TABLE attendance_new RENAME TO attendance")
+
+    cur.execute("""
+        CREATE UNIQUE INDEX ux_attendance_student_subject_date
+        ON attendance (student_id, subject_id, date)
+    """)
+    cur.execute("""
+        CREATE INDEX ix_attendance_teacher_date
+        ON attendance (teacher_id, date, roll_number, student_id, subject_id, status)
+    """)
+    cur.execute("""
+        CREATE INDEX ix_attendance_student_date
+        ON attendance (student_id, date, subject_id, teacher_id, status)
+    """)
+    cur.execute("""
+        CREATE INDEX ix_attendance_date_subject
+        ON attendance (date, subject_id, student_id, status)
+    """)
+
+
+ATTENDANCE_MIGRATIONS = [
+    create_attendance,
+    unique_attendance,
+    attendance_indexes,
+    normalize_attendance,
+]
+
+
+# ---------- 3️⃣ STUDENT STATUS DATABASE ----------
+def create_student_status(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS student_status (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_name TEXT,
+            roll_number INTEGER,
+            got_books INTEGER DEFAULT 0,
+            got_uniform INTEGER DEFAULT 0,
+            fees_paid INTEGER DEFAULT 0
+        )
+    """)
+
+
+def key_status_by_student(cur):
+    """
+    Key student_status by users.id instead of the student's name, one row
+    per student. Names with no account get an inactive placeholder user,
+    as in normalize_attendance.
+    """
+    cur.execute("""
+        INSERT OR IGNORE INTO login.users (username, password, role)
+        SELECT DISTINCT student_name, '', 'Student' FROM student_status
+        WHERE student_name IS NOT NULL
+    """)
+    cur.execute("""
+        CREATE TABLE student_status_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER UNIQUE NOT NULL,
+            roll_number INTEGER,
+            got_books INTEGER DEFAULT 0,
+            got_uniform INTEGER DEFAULT 0,
+            fees_paid INTEGER DEFAULT 0
+        )
+    """)
+    # Bare columns next to MAX(id) come from the newest row for each student
+    cur.execute("""
+        INSERT INTO student_status_new (id, student_id, roll_number, got_books, got_uniform, fees_paid)
+        SELECT MAX(st.id), u.id, st.roll_number, st.got_books, st.got_uniform, st.fees_paid
+        FROM student_status st
+        JOIN login.users u ON u.username = st.student_name
+        GROUP BY u.id
+    """)
+    cur.execute("DROP TABLE student_status")
+    cur.execute("ALTER TABLE student_status_new RENAME TO student_status")
+
+
+STATUS_MIGRATIONS = [
+    create_student_status,
+    key_status_by_student,
+]
+
+
+# ---------- 4️⃣ SCHOOL DATABASE ----------
+# The three databases above are merged into one file, so attendance and
+# status can reference users with real foreign keys and cross-table work
+# is a single statement. Their migrations are kept to upgrade old files
+# before they are imported.
+def create_school_tables(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL REFERENCES users(id),
+            roll_number INTEGER,
+            date TEXT NOT NULL,
+            subject_id INTEGER NOT NULL REFERENCES subjects(id),
+            teacher_id INTEGER REFERENCES users(id),
+            status TEXT CHECK(status IN ('Present', 'Absent')) NOT NULL
+        )
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_student_subject_date
+        ON attendance (student_id, subject_id, date)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_attendance_teacher_date
+        ON attendance (teacher_id, date, roll_number, student_id, subject_id, status)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_attendance_student_date
+        ON attendance (student_id, date, subject_id, teacher_id, status)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS ix_attendance_date_subject
+        ON attendance (date, subject_id, student_id, status)
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS student_status (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER UNIQUE NOT NULL REFERENCES users(id),
+            roll_number INTEGER,
+            got_books INTEGER DEFAULT 0,
+            got_uniform INTEGER DEFAULT 0,
+            fees_paid INTEGER DEFAULT 0
+        )
+    """)
+
+
+def import_legacy_databases(cur):
+    """
+    Copy rows from whichever old database files were attached, keeping
+    their IDs so every student/teacher/subject reference stays valid.
+    """
+    cur.execute("PRAGMA database_list")
+    attached = {row[1] for row in cur.fetchall()}
+
+    if "legacy_login" in attached:
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT CHECK(role IN ('Student', 'Teacher')) NOT NULL,
-                roll_number INTEGER
-            )
+            INSERT INTO users (id, username, password, role, roll_number, user_id)
+            SELECT id, username, password, role, roll_number, user_id FROM legacy_login.users
         """)
-        conn.commit()
-        print("🟢 logindata.db created successfully.")
-        conn.close()
-
-    # ---------- 2️⃣ ATTENDANCE DATABASE ----------
-        # ---------- 2️⃣ ATTENDANCE DATABASE ----------
-    if not os.path.exists("attendance.db"):
-        conn = sqlite3.connect("attendance.db")
-        cur = conn.cursor()
+        for table in ("meals", "goods", "academics"):
+            cur.execute(f"INSERT INTO {table} SELECT * FROM legacy_login.{table}")
+
+    if "legacy_attendance" in attached:
+        cur.execute("INSERT INTO subjects (id, name) SELECT id, name FROM legacy_attendance.subjects")
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS attendance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_name TEXT NOT NULL,
-                roll_number INTEGER,
-                date TEXT NOT NULL,
-                subject TEXT NOT NULL DEFAULT 'General',
-                teacher_name TEXT,
-                status TEXT CHECK(status IN ('Present', 'Absent')) NOT NULL
-            )
+            INSERT INTO attendance (id, student_id, roll_number, date, subject_id, teacher_id, status)
+            SELECT id, student_id, roll_number, date, subject_id, teacher_id, status
+            FROM legacy_attendance.attendance
         """)
-        conn.commit()
-        print("🟢 attendance.db created successfully with default subject column.")
-        conn.close()
-
-    # ---------- 3️⃣ STUDENT STATUS DATABASE ----------
-    if not os.path.exists("studentstatus.db"):
-        conn = sqlite3.connect("studentstatus.db")
-        cur = conn.cursor()
+
+    if "legacy_status" in attached:
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS student_status (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_name TEXT,
-                roll_number INTEGER,
-                got_books INTEGER DEFAULT 0,
-                got_uniform INTEGER DEFAULT 0,
-                fees_paid INTEGER DEFAULT 0
-            )
+            INSERT INTO student_status (id, student_id, roll_number, got_books, got_uniform, fees_paid)
+            SELECT id, student_id, roll_number, got_books, got_uniform, fees_paid
+            FROM legacy_status.student_status
         """)
-        conn.commit()
-        print("🟢 studentstatus.db created successfully.")
-        conn.close()
 
-# Run once when imported
-init_databases()
+
+def create_sync_state(cur):
+    """High-water marks for incremental syncs, e.g. the last users.id given a status row."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def create_attendance_search(cur):
+    """
+    Full-text index of each attendance row's student, subject and teacher
+    names, keyed by attendance.id and kept in step by triggers. Prefix
+    indexes on 2 and 3 characters keep search-as-you-type queries cheap.
+    """
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS attendance_fts
+        USING fts5(student, subject, teacher, prefix='2 3')
+    """)
+    cur.execute("""
+        INSERT INTO attendance_fts (rowid, student, subject, teacher)
+        SELECT a.id, s.username, sub.name, t.username
+        FROM attendance a
+        JOIN users s ON s.id = a.student_id
+        JOIN subjects sub ON sub.id = a.subject_id
+        LEFT JOIN users t ON t.id = a.teacher_id
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS attendance_fts_insert AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_fts (rowid, student, subject, teacher) VALUES (
+                NEW.id,
+                (SELECT username FROM users WHERE id = NEW.student_id),
+                (SELECT name FROM subjects WHERE id = NEW.subject_id),
+                (SELECT username FROM users WHERE id = NEW.teacher_id)
+            );
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS attendance_fts_delete AFTER DELETE ON attendance
+        BEGIN
+            DELETE FROM attendance_fts WHERE rowid = OLD.id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS attendance_fts_update
+        AFTER UPDATE OF id, student_id, subject_id, teacher_id ON attendance
+        BEGIN
+            DELETE FROM attendance_fts WHERE rowid = OLD.id;
+            INSERT INTO attendance_fts (rowid, student, subject, teacher) VALUES (
+                NEW.id,
+                (SELECT username FROM users WHERE id = NEW.student_id),
+                (SELECT name FROM subjects WHERE id = NEW.subject_id),
+                (SELECT username FROM users WHERE id = NEW.teacher_id)
+            );
+        END
+    """)
+    # Renamed users and subjects must be findable under their new names
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS attendance_fts_rename_user
+        AFTER UPDATE OF username ON users
+        BEGIN
+            UPDATE attendance_fts SET student = NEW.username
+            WHERE rowid IN (SELECT id FROM attendance WHERE student_id = NEW.id);
+            UPDATE attendance_fts SET teacher = NEW.username
+            WHERE rowid IN (SELECT id FROM attendance WHERE teacher_id = NEW.id);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS attendance_fts_rename_subject
+        AFTER UPDATE OF name ON subjects
+        BEGIN
+            UPDATE attendance_fts SET subject = NEW.name
+            WHERE rowid IN (SELECT id FROM attendance WHERE subject_id = NEW.id);
+        END
+    """)
+
+
+def create_attendance_summary(cur):
+    """
+    Present and total counts per student, subject and month ('YYYY-MM'),
+    maintained by triggers so percentages never scan raw attendance.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_summary (
+            student_id INTEGER NOT NULL REFERENCES users(id),
+            subject_id INTEGER NOT NULL REFERENCES subjects(id),
+            month TEXT NOT NULL,
+            present INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, subject_id, month)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        INSERT INTO attendance_summary (student_id, subject_id, month, present, total)
+        SELECT student_id, subject_id, substr(date, 1, 7), SUM(status = 'Present'), COUNT(*)
+        FROM attendance
+        GROUP BY student_id, subject_id, substr(date, 1, 7)
+    """)
+    count_new = """
+        INSERT INTO attendance_summary (student_id, subject_id, month, present, total)
+        VALUES (NEW.student_id, NEW.subject_id, substr(NEW.date, 1, 7), NEW.status = 'Present', 1)
+        ON CONFLICT (student_id, subject_id, month) DO UPDATE SET
+            present = present + excluded.present,
+            total = total + 1;
+    """
+    uncount_old = """
+        UPDATE attendance_summary
+        SET present = present - (OLD.status = 'Present'), total = total - 1
+        WHERE student_id = OLD.student_id AND subject_id = OLD.subject_id
+          AND month = substr(OLD.date, 1, 7);
+    """
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS attendance_summary_insert AFTER INSERT ON attendance
+        BEGIN {count_new} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS attendance_summary_delete AFTER DELETE ON attendance
+        BEGIN {uncount_old} END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS attendance_summary_update
+        AFTER UPDATE OF student_id, subject_id, date, status ON attendance
+        BEGIN {uncount_old} {count_new} END
+    """)
+
+
+def create_data_versions(cur):
+    """Change counters bumped by triggers, used to invalidate cached analytics."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cur.execute("INSERT OR IGNORE INTO data_versions (name) VALUES ('attendance')")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS attendance_version_{event.lower()}
+            AFTER {event} ON attendance
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE name = 'attendance';
+            END
+        """)
+
+
+def add_user_active(cur):
+    """
+    Flag placeholder users as inactive. The legacy imports created them,
+    with an empty password, for names found only in old attendance or
+    status rows; registration always sets a password. Inactive users keep
+    their history but are left out of rosters and cannot log in.
+    """
+    add_column_if_missing(cur, "users", "active", "INTEGER NOT NULL DEFAULT 1")
+    cur.execute("UPDATE users SET active = 0 WHERE password = ''")
+
+
+SCHOOL_MIGRATIONS = [
+    create_users,
+    add_user_id,
+    create_student_info_tables,
+    create_school_tables,
+    import_legacy_databases,
+    create_sync_state,
+    create_attendance_search,
+    create_attendance_summary,
+    create_data_versions,
+    add_user_active,
+]
+
+# Old per-area database files, upgraded in this order before import
+LEGACY_DATABASES = [
+    ("legacy_login", "logindata.db", LOGIN_MIGRATIONS, None),
+    ("legacy_attendance", "attendance.db", ATTENDANCE_MIGRATIONS, {"login": "logindata.db"}),
+    ("legacy_status", "studentstatus.db", STATUS_MIGRATIONS, {"login": "logindata.db"}),
+]
+
+
+def init_databases():
+    """Create or upgrade the school database, importing the old files once."""
+    legacy = {}
+    if schema_version(DB_PATH) < SCHOOL_MIGRATIONS.index(import_legacy_databases) + 1:
+        for alias, path, migrations, attach in LEGACY_DATABASES:
+            if os.path.exists(path):
+                migrate(path, migrations, attach=attach)
+                legacy[alias] = path
+    migrate(DB_PATH, SCHOOL_MIGRATIONS, attach=legacy)
+
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def ensure_databases():
+    """
+    Run init_databases() once per process. Later calls return at once, or
+    wait if another thread (e.g. login's startup thread) is still running it.
+    """
+    global _initialized
+    with _init_lock:
+        if not _initialized:
+            init_databases()
+            _initialized = True
@@ -0,0 +1,96 @@
+# detection_scheduler.py
+import threading
+import time
+
+import cv2
+
+# Motion is measured on a tiny thumbnail of the frame
+MOTION_SIZE = (64, 48)
+
+
+class DetectionScheduler:
+    """
+    Decides which frames get a full face detection, and at what resolution.
+
+    Detection runs every `every` frames, or sooner when the frame has
+    changed noticeably since the last detection. Frames are downscaled to
+    `detect_width` before detection and boxes are mapped back to full size.
+    Both knobs adapt to keep the detector within the per-frame budget of
+    `target_fps`: first run less often, then detect at a lower resolution.
+    Thread-safe, so it can be shared by the recognition workers.
+    """
+
+    def __init__(self, target_fps=15, detect_width=640, min_width=320,
+                 max_every=8, motion_threshold=6.0):
+        self.budget = 1.0 / target_fps
+        self.max_width = detect_width
+        self.min_width = min_width
+        self.max_every = max_every
+        self.motion_threshold = motion_threshold
+
+        self.every = 1
+        self.detect_width = detect_width
+        self.detect_time = None     # moving average, seconds
+        self.last_frame_id = None
+        self.last_thumbnail = None
+        self.lock = threading.Lock()
+
+    # -------------------- SCHEDULING --------------------
+    def should_detect(self, frame_id, frame):
+        """True if this frame needs a full detection pass."""
+        thumbnail = cv2.resize(frame, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        if thumbnail.ndim == 3:
+            thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+
+        with self.lock:
+            due = (self.last_frame_id is None
+                   or frame_id - self.last_frame_id >= self.every)
+            if not due and frame_id > self.last_frame_id:
+                motion = cv2.absdiff(thumbnail, self.last_thumbnail).mean()
+                due = motion > self.motion_threshold
+            if due:
+                self.last_frame_id = frame_id
+                self.last_thumbnail = thumbnail
+            return due
+
+    # -------------------- DETECTION --------------------
+    def detect(self, frame, detect_faces):
+        """
+        Run `detect_faces(small_frame)` on a downscaled frame and return
+        (x, y, w, h) boxes in full-resolution coordinates.
+        """
+        height, width = frame.shape[:2]
+        with self.lock:
+            scale = min(1.0, self.detect_width / float(width))
+
+        small = frame
+        if scale < 1.0:
+            small = cv2.resize(frame, (int(width * scale), int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+
+        start = time.perf_counter()
+        faces = detect_faces(small)
+        self.adapt(time.perf_counter() - start)
+
+        return [tuple(int(round(v / scale)) for v in box) for box in faces]
+
+    def adapt(self, elapsed):
+        """Retune `every` and `detect_width` from the measured detection time."""
+        with self.lock:
+            if self.detect_time is None:
+                self.detect_time = elapsed
+            else:
+                self.detect_time = 0.8 * self.detect_time + 0.2 * elapsed
+
+            # Cost per frame, amortised over the frames that skip detection
+            cost = self.detect_time / self.every
+            if cost > self.budget:
+                if self.every < self.max_every:
+                    self.every += 1
+                elif self.detect_width > self.min_width:
+                    self.detect_width = max(self.min_width, int(self.detect_width * 0.8))
+            elif cost < self.budget / 2:
+                if self.detect_width < self.max_width:
+                    self.detect_width = min(self.max_width, int(self.detect_width * 1.25))
+                elif self.every > 1:
+                    self.every -= 1
@@ -0,0 +1,106 @@
+# detector_benchmark.py
+import argparse
+import json
+import os
+import time
+
+import cv2
+
+from face_detector import DETECTORS, create_detector
+from face_tracker import iou
+
+# Constants
+LABELS_FILE = "labels.json"
+IOU_MATCH = 0.5
+
+
+def load_labelled_frames(folder):
+    """
+    Read a benchmark folder: images plus labels.json mapping each image
+    file name to its ground-truth [[x, y, w, h], ...] face boxes.
+    """
+    with open(os.path.join(folder, LABELS_FILE), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    frames = []
+    for file_name, boxes in sorted(labels.items()):
+        image = cv2.imread(os.path.join(folder, file_name))
+        if image is None:
+            print(f"⚠️ Skipping {file_name}: could not read image.")
+            continue
+        frames.append((image, [tuple(box) for box in boxes]))
+    return frames
+
+
+def count_matches(predicted, truth):
+    """Greedy one-to-one matching of predicted boxes to labelled boxes at IoU >= 0.5."""
+    unmatched = list(truth)
+    matched = 0
+    for box in predicted:
+        best = max(unmatched, key=lambda t: iou(box, t), default=None)
+        if best is not None and iou(box, best) >= IOU_MATCH:
+            unmatched.remove(best)
+            matched += 1
+    return matched
+
+
+def benchmark(detector_name, frames, width=None):
+    """Run one detector over all frames; returns a dict of speed and accuracy figures."""
+    detector = create_detector(detector_name)
+
+    # Scale every frame to the classroom PC's detection width up front,
+    # so resizing is not counted as detector time
+    inputs = []
+    for image, truth in frames:
+        scale = 1.0
+        if width and image.shape[1] > width:
+            scale = width / float(image.shape[1])
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        inputs.append((image, [tuple(v * scale for v in box) for box in truth]))
+
+    detector.detect(inputs[0][0])   # warm-up, e.g. DNN graph allocation
+
+    total_truth = total_predicted = total_matched = 0
+    start = time.perf_counter()
+    predictions = [detector.detect(image) for image, _ in inputs]
+    elapsed = time.perf_counter() - start
+
+    for (_, truth), predicted in zip(inputs, predictions):
+        total_truth += len(truth)
+        total_predicted += len(predicted)
+        total_matched += count_matches(predicted, truth)
+
+    return {
+        "detector": detector_name,
+        "frames_per_sec": len(inputs) / elapsed if elapsed else 0.0,
+        "faces_per_sec": total_truth / elapsed if elapsed else 0.0,
+        "recall": total_matched / total_truth if total_truth else 0.0,
+        "precision": total_matched / total_predicted if total_predicted else 0.0,
+    }
+
+
+# ------------------- ENTRY POINT -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare face detector speed and recall on a folder of labelled frames."
+    )
+    parser.add_argument("folder", help=f"folder of images with a {LABELS_FILE}")
+    parser.add_argument("--detectors", nargs="+", default=list(DETECTORS),
+                        help="backends to compare (default: all)")
+    parser.add_argument("--width", type=int, default=None,
+                        help="downscale frames to this width before detection")
+    args = parser.parse_args()
+
+    frames = load_labelled_frames(args.folder)
+    if not frames:
+        print("❌ No labelled frames found.")
+    else:
+        print(f"{'detector':<10}{'frames/s':>10}{'faces/s':>10}{'recall':>9}{'precision':>11}")
+        for name in args.detectors:
+            try:
+                result = benchmark(name, frames, args.width)
+            except (ValueError, FileNotFoundError) as e:
+                print(f"{name:<10}  skipped: {str(e)}")
+                continue
+            print(f"{name:<10}{result['frames_per_sec']:>10.1f}{result['faces_per_sec']:>10.1f}"
+                  f"{result['recall']:>9.2%}{result['precision']:>11.2%}")
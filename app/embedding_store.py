@@ -0,0 +1,188 @@
+# embedding_store.py
+import os
+import re
+import json
+import hashlib
+import numpy as np
+
+# Bump when the on-disk layout changes; older stores are converted or rebuilt
+STORE_VERSION = 2
+STORE_DIR_NAME = ".embeddings"
+INDEX_FILE = "index.json"
+
+
+def file_hash(path):
+    """SHA-1 of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_atomic(path, write):
+    """Write through a temp file and rename, so a crash never leaves half a file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def set_slug(model_name, detector):
+    """File-name-safe tag for one model and detector, e.g. vgg-face-haar."""
+    return re.sub(r"[^a-z0-9]+", "-", f"{model_name}-{detector}".lower()).strip("-")
+
+
+class EmbeddingStore:
+    """
+    Versioned on-disk cache of gallery embeddings.
+
+    Each model and detector pair has its own embedding set (matrix file
+    plus path -> content hash and row), so an entry is only reused for the
+    same path, hash, model and detector, and switching detectors does not
+    throw away the other sets. File sizes, mtimes and hashes are shared by
+    all sets. `sync` re-embeds only images that were added or changed,
+    drops deleted ones, and returns the matrix as a read-only memory map.
+    A set's `generation` goes up every time its matrix is rewritten, so
+    indexes built from it (saved at `ivf_path`) know when to retrain.
+    """
+
+    def __init__(self, images_dir, model_name, detector, image_extensions):
+        self.images_dir = images_dir
+        self.model_name = model_name
+        self.detector = detector
+        self.image_extensions = image_extensions
+        self.store_dir = os.path.join(images_dir, STORE_DIR_NAME)
+        self.index_path = os.path.join(self.store_dir, INDEX_FILE)
+
+        self.set_key = f"{model_name}|{detector}"
+        slug = set_slug(model_name, detector)
+        self.matrix_file = f"embeddings-{slug}.npy"
+        self.ivf_path = os.path.join(self.store_dir, f"ivf-{slug}.npz")
+        self.generation = 0
+
+    # -------------------- SCAN --------------------
+    def scan_images(self):
+        """Relative paths of every gallery image, including per-student folders."""
+        paths = []
+        for root, dirs, files in os.walk(self.images_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for file_name in sorted(files):
+                if file_name.lower().endswith(self.image_extensions):
+                    full_path = os.path.join(root, file_name)
+                    paths.append(os.path.relpath(full_path, self.images_dir))
+        return paths
+
+    # -------------------- INDEX --------------------
+    def load_index(self):
+        """Return the saved index, converting a version 1 store; a fresh one if missing or unknown."""
+        empty = {"version": STORE_VERSION, "files": {}, "sets": {}}
+        if not os.path.exists(self.index_path):
+            return empty
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return empty
+
+        if index.get("version") == 1:
+            return self.convert_v1(index)
+        if index.get("version") != STORE_VERSION:
+            print("ℹ️ Embedding store has an unknown layout, rebuilding.")
+            return empty
+        return index
+
+    @staticmethod
+    def convert_v1(index):
+        """Version 1 held one model/detector's entries; keep them as that pair's set."""
+        entries = index.get("entries", {})
+        files = {path: {"hash": e["hash"], "size": e["size"], "mtime": e["mtime"]}
+                 for path, e in entries.items()}
+        rows = {path: {"hash": e["hash"], "row": e["row"]} for path, e in entries.items()}
+        embedding_set = {"matrix": "embeddings.npy", "generation": index.get("generation", 0),
+                         "rows": rows}
+        return {"version": STORE_VERSION, "files": files,
+                "sets": {f"{index.get('model')}|{index.get('detector')}": embedding_set}}
+
+    def save_index(self, index):
+        os.makedirs(self.store_dir, exist_ok=True)
+        write_atomic(self.index_path,
+                     lambda f: f.write(json.dumps(index, indent=1).encode("utf-8")))
+
+    # -------------------- SYNC --------------------
+    def sync(self, embed_images):
+        """
+        Bring this model/detector's embeddings up to date with the images folder.
+
+        `embed_images(paths)` receives absolute paths of new or changed images
+        and returns (embedded_paths, matrix) for the ones it could embed.
+        Returns (relative_paths, embeddings) in matrix row order.
+        """
+        index = self.load_index()
+        old_files = index["files"]
+        embedding_set = index["sets"].get(self.set_key)
+        old_rows = embedding_set["rows"] if embedding_set else {}
+        matrix_path = os.path.join(self.store_dir, embedding_set["matrix"]) if embedding_set else None
+        if matrix_path and not os.path.exists(matrix_path):
+            embedding_set, old_rows, matrix_path = None, {}, None
+        self.generation = embedding_set["generation"] if embedding_set else 0
+
+        # Size and mtime unchanged: trust the stored hash instead of re-reading the file
+        files = {}
+        for rel_path in self.scan_images():
+            stat = os.stat(os.path.join(self.images_dir, rel_path))
+            known = old_files.get(rel_path)
+            if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime:
+                files[rel_path] = known
+            else:
+                content_hash = file_hash(os.path.join(self.images_dir, rel_path))
+                files[rel_path] = {"hash": content_hash, "size": stat.st_size, "mtime": stat.st_mtime}
+
+        kept = {p: e for p, e in old_rows.items() if p in files and files[p]["hash"] == e["hash"]}
+        to_embed = [p for p in files if p not in kept]
+        removed = len(set(old_rows) - set(files))
+        index["files"] = files
+
+        if not to_embed and not removed and (embedding_set or not files):
+            if files != old_files:
+                # Touched but unchanged files: remember their new stat so they are not hashed again
+                self.save_index(index)
+            paths = sorted(kept, key=lambda p: kept[p]["row"])
+            if matrix_path is None:
+                return paths, np.empty((0, 0), dtype=np.float32)
+            return paths, np.load(matrix_path, mmap_mode="r")
+
+        print(f"🔄 Updating embedding store ({self.model_name}, {self.detector}): "
+              f"{len(to_embed)} new/changed, {removed} removed.")
+
+        paths = sorted(kept, key=lambda p: kept[p]["row"])
+        blocks = []
+        if paths:
+            old_matrix = np.load(matrix_path, mmap_mode="r")
+            blocks.append(np.asarray(old_matrix[[kept[p]["row"] for p in paths]]))
+            del old_matrix  # release the memory map before the file is replaced
+
+        if to_embed:
+            pending = {os.path.join(self.images_dir, p): p for p in to_embed}
+            embedded_paths, new_matrix = embed_images(list(pending))
+            paths += [pending[full_path] for full_path in embedded_paths]
+            if len(embedded_paths):
+                blocks.append(np.asarray(new_matrix, dtype=np.float32))
+
+        matrix = np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+        self.generation += 1
+        index["sets"][self.set_key] = {
+            "matrix": self.matrix_file,
+            "generation": self.generation,
+            "rows": {p: {"hash": files[p]["hash"], "row": row} for row, p in enumerate(paths)},
+        }
+
+        matrix_path = os.path.join(self.store_dir, self.matrix_file)
+        os.makedirs(self.store_dir, exist_ok=True)
+        write_atomic(matrix_path,
+                     lambda f: np.save(f, np.ascontiguousarray(matrix, dtype=np.float32)))
+        self.save_index(index)
+        if embedding_set and embedding_set["matrix"] != self.matrix_file:
+            # A converted version 1 set has now been rewritten under its own name
+            os.remove(os.path.join(self.store_dir, embedding_set["matrix"]))
+        return paths, np.load(matrix_path, mmap_mode="r")
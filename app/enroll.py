@@ -0,0 +1,90 @@
+# enroll.py
+import cv2
+import os
+import re
+import sys
+import time
+
+from face_gallery import FaceGallery
+from face_detector import create_detector
+
+# Constants
+STUDENT_IMAGES_DIR = "student_images"
+DETECTOR = "haar"
+PHOTO_COUNT = 5
+CAPTURE_INTERVAL = 1.0      # seconds between automatic captures
+
+
+def next_photo_number(student_dir, student_name):
+    """One past the highest <name>_<n> photo number, so gaps never cause an overwrite."""
+    pattern = re.compile(re.escape(student_name) + r"_(\d+)\.\w+$")
+    numbers = [int(m.group(1)) for m in map(pattern.match, os.listdir(student_dir)) if m]
+    return max(numbers, default=0) + 1
+
+
+def enroll_student(student_name, photo_count=PHOTO_COUNT):
+    """
+    Capture several webcam photos of one student into student_images/<name>/
+    and refresh the gallery so the new templates are ready for recognition.
+    A photo is taken automatically once a second while exactly one face is
+    in view; press 'q' to stop early.
+    """
+    student_dir = os.path.join(STUDENT_IMAGES_DIR, student_name)
+    os.makedirs(student_dir, exist_ok=True)
+    first_number = next_photo_number(student_dir, student_name)
+
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        print("❌ Could not open webcam.")
+        return 0
+
+    print(f"📷 Enrolling '{student_name}': look at the camera and turn your head slightly between shots.")
+
+    face_detector = create_detector(DETECTOR)
+    captured = 0
+    last_capture = 0.0
+    window_title = f"Enroll - {student_name}"
+
+    while captured < photo_count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        faces = face_detector.detect(frame)
+
+        now = time.time()
+        if len(faces) == 1 and now - last_capture >= CAPTURE_INTERVAL:
+            path = os.path.join(student_dir, f"{student_name}_{first_number + captured}.jpg")
+            cv2.imwrite(path, frame)
+            captured += 1
+            last_capture = now
+            print(f"✅ Photo {captured}/{photo_count} saved.")
+
+        preview = frame.copy()
+        for (x, y, w, h) in faces:
+            color = (0, 255, 0) if len(faces) == 1 else (0, 0, 255)
+            cv2.rectangle(preview, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(preview, f"{captured}/{photo_count}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+        cv2.imshow(window_title, preview)
+        if cv2.waitKey(1) & 0xFF == ord("q"):
+            break
+
+    cap.release()
+    cv2.destroyAllWindows()
+
+    if captured:
+        # Embed the new photos now instead of at the next recognition start
+        FaceGallery(STUDENT_IMAGES_DIR, detector=DETECTOR).load()
+    print(f"👋 Enrollment closed, {captured} photo(s) captured.")
+    return captured
+
+
+# ------------------- ENTRY POINT -------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("❌ Usage: python enroll.py <student_name> [photo_count]")
+    else:
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else PHOTO_COUNT
+        enroll_student(sys.argv[1], count)
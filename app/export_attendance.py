@@ -0,0 +1,131 @@
+# export_attendance.py
+import argparse
+import csv
+import os
+
+import database
+from attendance_db import ATTENDANCE_ROWS
+
+# Parquet export is optional; CSV needs nothing beyond the standard library
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Constants
+CHUNK_SIZE = 5000
+COLUMNS = ["roll_number", "student", "date", "subject", "teacher", "status"]
+
+
+def export_filter(start=None, end=None, subject=None, teacher=None):
+    """WHERE clause and params for the export, so filtering happens in SQL."""
+    conditions, params = [], []
+    if start:
+        conditions.append("a.date >= ?")
+        params.append(start)
+    if end:
+        conditions.append("a.date <= ?")
+        params.append(end)
+    if subject:
+        conditions.append("a.subject_id = (SELECT id FROM subjects WHERE name = ?)")
+        params.append(subject)
+    if teacher:
+        conditions.append("a.teacher_id = (SELECT id FROM users WHERE username = ?)")
+        params.append(teacher)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+def export_attendance(path, start=None, end=None, subject=None, teacher=None,
+                      progress=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream attendance rows matching the filters to `path`, as Parquet if it
+    ends in .parquet and CSV otherwise. Rows are read and written
+    `chunk_size` at a time, so memory does not grow with the date range.
+    `progress(done, total)` is called after every chunk; if it returns
+    False the export stops and the partial file is removed.
+    Returns the number of rows written, or None if cancelled.
+    """
+    parquet = path.lower().endswith(".parquet")
+    if parquet and pq is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+
+    where, params = export_filter(start, end, subject, teacher)
+
+    # A separate connection keeps the long read off the shared one
+    conn = database.open_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM attendance a" + where, params)
+        total = cur.fetchone()[0]
+        cur.execute(ATTENDANCE_ROWS + where + " ORDER BY a.date, a.id", params)
+
+        write = write_parquet if parquet else write_csv
+        done = write(path, cur, chunk_size, total, progress)
+    finally:
+        conn.close()
+
+    if done is None and os.path.exists(path):
+        os.remove(path)
+    return done
+
+
+def write_csv(path, cursor, chunk_size, total, progress):
+    done = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return done
+            writer.writerows(rows)
+            done += len(rows)
+            if progress and progress(done, total) is False:
+                return None
+
+
+def write_parquet(path, cursor, chunk_size, total, progress):
+    schema = pa.schema([
+        ("roll_number", pa.int64()), ("student", pa.string()), ("date", pa.string()),
+        ("subject", pa.string()), ("teacher", pa.string()), ("status", pa.string()),
+    ])
+    done = 0
+    # Each chunk becomes one row group
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return done
+            columns = [list(column) for column in zip(*rows)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            done += len(rows)
+            if progress and progress(done, total) is False:
+                return None
+
+
+# ------------------- ENTRY POINT -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export attendance to CSV, or to Parquet when the file name ends in .parquet."
+    )
+    parser.add_argument("output", help="output file (.csv or .parquet)")
+    parser.add_argument("--start", help="first date to include, YYYY-MM-DD")
+    parser.add_argument("--end", help="last date to include, YYYY-MM-DD")
+    parser.add_argument("--subject", help="only this subject")
+    parser.add_argument("--teacher", help="only classes taken by this teacher")
+    args = parser.parse_args()
+
+    from db__initializer import init_databases
+    init_databases()
+
+    def report(done, total):
+        print(f"\r⏳ {done}/{total} rows", end="", flush=True)
+
+    try:
+        count = export_attendance(args.output, args.start, args.end, args.subject,
+                                  args.teacher, progress=report)
+        print(f"\n✅ Exported {count} rows to {args.output}")
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
@@ -0,0 +1,133 @@
+# face_detector.py
+import os
+
+import cv2
+import numpy as np
+
+# Model files for the DNN / LBP backends are looked up here
+MODELS_DIR = "models"
+HAAR_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+LBP_CASCADE_FILE = "lbpcascade_frontalface_improved.xml"
+YUNET_MODEL_FILE = "face_detection_yunet_2023mar.onnx"
+SSD_PROTOTXT_FILE = "deploy.prototxt"
+SSD_MODEL_FILE = "res10_300x300_ssd_iter_140000.caffemodel"
+
+
+def model_path(file_name):
+    path = os.path.join(MODELS_DIR, file_name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Detector model not found: {path}")
+    return path
+
+
+class FaceDetector:
+    """
+    Base class for face detectors.
+    `detect(frame)` takes a BGR image and returns a list of (x, y, w, h) boxes.
+    Instances are not thread-safe; create one per worker thread.
+    """
+
+    name = None
+
+    def detect(self, frame):
+        raise NotImplementedError
+
+
+class CascadeDetector(FaceDetector):
+    """OpenCV cascade classifier (Haar or LBP) on the grayscale frame."""
+
+    def __init__(self, cascade_path, scale_factor=1.1, min_neighbors=5):
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise FileNotFoundError(f"Could not load cascade: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def detect(self, frame):
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self.cascade.detectMultiScale(
+            gray, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors)
+        return [tuple(int(v) for v in box) for box in faces]
+
+
+class HaarDetector(CascadeDetector):
+    name = "haar"
+
+    def __init__(self, **options):
+        super().__init__(HAAR_CASCADE_PATH, **options)
+
+
+class LBPDetector(CascadeDetector):
+    """LBP cascade: less accurate than Haar, but several times faster on CPU."""
+
+    name = "lbp"
+
+    def __init__(self, **options):
+        super().__init__(model_path(LBP_CASCADE_FILE), **options)
+
+
+class YuNetDetector(FaceDetector):
+    """OpenCV's YuNet CNN detector (cv2.FaceDetectorYN, OpenCV 4.5.4+)."""
+
+    name = "yunet"
+
+    def __init__(self, score_threshold=0.8):
+        self.model = cv2.FaceDetectorYN.create(
+            model_path(YUNET_MODEL_FILE), "", (320, 320), score_threshold)
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        self.model.setInputSize((width, height))
+        _, faces = self.model.detect(frame)
+        if faces is None:
+            return []
+
+        # Faces partly outside the frame come back with negative x/y
+        boxes = []
+        for face in faces:
+            x1, y1, w, h = (int(v) for v in face[:4])
+            x2, y2 = min(width, x1 + w), min(height, y1 + h)
+            x1, y1 = max(0, x1), max(0, y1)
+            if x2 > x1 and y2 > y1:
+                boxes.append((x1, y1, x2 - x1, y2 - y1))
+        return boxes
+
+
+class SSDDetector(FaceDetector):
+    """ResNet-10 SSD face detector through cv2.dnn."""
+
+    name = "ssd"
+
+    def __init__(self, confidence=0.5):
+        self.net = cv2.dnn.readNetFromCaffe(model_path(SSD_PROTOTXT_FILE), model_path(SSD_MODEL_FILE))
+        self.confidence = confidence
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+
+        boxes = []
+        for detection in detections:
+            if detection[2] < self.confidence:
+                continue
+            x1, y1, x2, y2 = (detection[3:7] * np.array([width, height, width, height])).astype(int)
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(width, x2), min(height, y2)
+            if x2 > x1 and y2 > y1:
+                boxes.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        return boxes
+
+
+DETECTORS = {
+    detector.name: detector
+    for detector in (HaarDetector, LBPDetector, YuNetDetector, SSDDetector)
+}
+
+
+def create_detector(name="haar", **options):
+    """Create a detector backend by name: haar, lbp, yunet or ssd."""
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown detector '{name}', choose from: {', '.join(DETECTORS)}")
+    return DETECTORS[name](**options)
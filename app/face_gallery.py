@@ -0,0 +1,202 @@
+# face_gallery.py
+import os
+import cv2
+import numpy as np
+from deepface import DeepFace
+
+from ann_index import build_index, normalize_rows, spherical_kmeans
+from embedding_store import EmbeddingStore
+from face_detector import create_detector
+
+# Constants
+MODEL_NAME = "VGG-Face"
+DISTANCE_THRESHOLD = 0.68   # DeepFace's cosine threshold for VGG-Face
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+DETECTOR_NAME = "haar"
+EMBED_CHUNK = 32            # images embedded per model call while enrolling
+
+
+def student_name(rel_path):
+    """
+    Identity of a gallery image: the folder name for enrolled photos
+    (<name>/<name>_1.jpg), otherwise the file name (<name>.jpg).
+    """
+    folder = os.path.dirname(rel_path)
+    if folder:
+        return folder.split(os.sep)[0]
+    return os.path.basename(rel_path).split('.')[0]
+
+
+def fit_to_input(face_crop, target_size):
+    """
+    Resize a BGR crop to the model input size, keeping its aspect ratio
+    and padding the rest with black (same as DeepFace's own preprocessing).
+    """
+    target_h, target_w = target_size
+    h, w = face_crop.shape[:2]
+    if not h or not w:
+        raise ValueError("Empty face crop.")
+    factor = min(target_h / h, target_w / w)
+    new_w, new_h = max(1, int(w * factor)), max(1, int(h * factor))
+    resized = cv2.resize(face_crop, (new_w, new_h))
+
+    canvas = np.zeros((target_h, target_w, 3), dtype=np.float32)
+    top = (target_h - new_h) // 2
+    left = (target_w - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+    return canvas / 255.0
+
+
+class FaceGallery:
+    """
+    Resident gallery of student face embeddings.
+    Per-photo embeddings are persisted by EmbeddingStore and memory-mapped
+    back in on the next start, then reduced to per-student templates kept as
+    one contiguous (N, D) float32 matrix. Lookups go through an index from
+    ann_index: an exact scan for a classroom, or IVF for the whole school.
+    """
+
+    def __init__(self, images_dir, model_name=MODEL_NAME, threshold=DISTANCE_THRESHOLD,
+                 detector=DETECTOR_NAME, prototypes=1, index_kind="auto", **index_options):
+        self.images_dir = images_dir
+        self.model_name = model_name
+        self.detector = detector
+        self.threshold = threshold
+        self.prototypes = prototypes
+        self.index_kind = index_kind
+        self.index_options = index_options
+        self.names = []
+        self.embeddings = np.empty((0, 0), dtype=np.float32)
+        self.index = build_index(self.embeddings)
+        self.model = None
+        self.input_size = None
+
+    def __len__(self):
+        return len(self.names)
+
+    # -------------------- MODEL --------------------
+    def build_model(self):
+        """Load the recognition model once and remember its input size."""
+        if self.model is None:
+            client = DeepFace.build_model(self.model_name)
+            # Newer DeepFace wraps the Keras model in a client object
+            self.model = getattr(client, "model", client)
+            self.input_size = tuple(self.model.input_shape[1:3])
+        return self.model
+
+    def embed(self, face_crops):
+        """
+        Embed a list of BGR face crops in one batch.
+        Crops come straight from our own detector; no second detection
+        pass is run inside the recognizer.
+        Returns an (N, D) matrix of L2-normalized embeddings.
+        """
+        self.build_model()
+        if not face_crops:
+            return np.empty((0, 0), dtype=np.float32)
+
+        batch = np.stack([fit_to_input(crop, self.input_size) for crop in face_crops])
+        output = self.model(batch, training=False)
+        vectors = np.asarray(output, dtype=np.float32)
+        return normalize_rows(vectors)
+
+    # -------------------- LOAD --------------------
+    def load(self):
+        """Load gallery embeddings, re-embedding only new or changed images."""
+        store = EmbeddingStore(self.images_dir, self.model_name, self.detector, IMAGE_EXTENSIONS)
+        paths, embeddings = store.sync(self.embed_images)
+
+        self.names, self.embeddings = self.build_templates(
+            [student_name(path) for path in paths], embeddings)
+        # A trained IVF index is reused until the store or the templates change
+        self.index = build_index(
+            self.embeddings, self.index_kind, cache_path=store.ivf_path,
+            cache_key=f"{self.model_name}|{self.detector}|{store.generation}|{self.prototypes}",
+            **self.index_options)
+
+        print(f"🗂️ Loaded {len(paths)} photo(s) of {len(set(self.names))} student(s) into the gallery.")
+        return self
+
+    def build_templates(self, photo_names, photo_embeddings):
+        """
+        Collapse each student's photos into `prototypes` template vectors
+        (1 = the centroid), so matching compares one vector per student
+        instead of every photo.
+        """
+        if not photo_names:
+            return [], np.empty((0, 0), dtype=np.float32)
+
+        rows_by_name = {}
+        for row, name in enumerate(photo_names):
+            rows_by_name.setdefault(name, []).append(row)
+
+        rng = np.random.default_rng(0)
+        names, templates = [], []
+        for name, rows in rows_by_name.items():
+            photos = np.asarray(photo_embeddings[rows], dtype=np.float32)
+            if len(photos) <= self.prototypes:
+                vectors = photos
+            elif self.prototypes == 1:
+                vectors = photos.mean(axis=0, keepdims=True)
+            else:
+                vectors = spherical_kmeans(photos, self.prototypes, rng)
+            names += [name] * len(vectors)
+            templates.append(vectors)
+
+        matrix = normalize_rows(np.concatenate(templates).astype(np.float32))
+        return names, np.ascontiguousarray(matrix)
+
+    def embed_images(self, paths):
+        """Embed image files in chunks; returns (embedded_paths, matrix)."""
+        detector = create_detector(self.detector)
+        embedded_paths, blocks = [], []
+
+        for start in range(0, len(paths), EMBED_CHUNK):
+            chunk_paths, crops = [], []
+            for path in paths[start:start + EMBED_CHUNK]:
+                image = cv2.imread(path)
+                if image is None:
+                    print(f"⚠️ Skipping {os.path.basename(path)}: could not read image.")
+                    continue
+                chunk_paths.append(path)
+                crops.append(self.crop_face(image, detector))
+
+            if crops:
+                embedded_paths += chunk_paths
+                blocks.append(self.embed(crops))
+            print(f"   embedded {min(start + EMBED_CHUNK, len(paths))}/{len(paths)} image(s)")
+
+        matrix = np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+        return embedded_paths, matrix
+
+    @staticmethod
+    def crop_face(image, detector):
+        """Crop the largest detected face, or keep the whole image if none is found."""
+        faces = detector.detect(image)
+        if not faces:
+            return image
+        x, y, w, h = max(faces, key=lambda box: box[2] * box[3])
+        crop = image[y:y + h, x:x + w]
+        return crop if crop.size else image
+
+    # -------------------- MATCH --------------------
+    def match(self, embedding):
+        """
+        Return (name, distance) of the nearest gallery face,
+        or (None, distance) if nothing is within the threshold.
+        """
+        return self.match_many(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+
+    def match_many(self, embeddings):
+        """Match a batch of embeddings against the gallery index."""
+        if not self.names or len(embeddings) == 0:
+            return [(None, None)] * len(embeddings)
+
+        indices, distances = self.index.search(normalize_rows(embeddings))
+
+        results = []
+        for index, distance in zip(indices, distances):
+            distance = float(distance)
+            name = self.names[index] if distance <= self.threshold else None
+            results.append((name, distance))
+        return results
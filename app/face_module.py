@@ -1,52 +1,62 @@
 # face_module.py
 import cv2
 import os
-import sqlite3
 import time
 import sys
-from datetime import datetime
-from deepface import DeepFace
+import threading
+
+from face_gallery import FaceGallery
+from face_detector import create_detector
+from frame_pipeline import FramePipeline
+from face_tracker import FaceTracker
+from detection_scheduler import DetectionScheduler
+from attendance_writer import AttendanceWriter
+import attendance_db
+import database
+from db__initializer import init_databases
 
 # Suppress TensorFlow logs
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
 # Constants
 STUDENT_IMAGES_DIR = "student_images"
-DB_PATH = "attendance.db"
-TEMP_IMAGE = "temp_face.jpg"
+DEFAULT_DETECTOR = "haar"
 
 
-def mark_attendance(student_name, subject, teacher_name):
+def lookup_ids(subject, teacher_name):
     """
-    Mark attendance for a recognized student for the given subject and teacher.
-    Only once per subject per day.
+    Resolve the session's subject and teacher, and every student account,
+    to integer IDs once, so recognition never looks names up per face.
+    Returns (student_ids_by_name, subject_id, teacher_id).
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    # Check if already marked for this subject and date
-    cursor.execute("""
-        SELECT * FROM attendance
-        WHERE student_name=? AND subject=? AND date=?
-    """, (student_name, subject, today))
-    result = cursor.fetchone()
-
-    if result is None:
-        cursor.execute("""
-            INSERT INTO attendance (student_name, roll_number, date, subject, teacher_name, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (student_name, None, today, subject, teacher_name, "Present"))
-        conn.commit()
-        print(f"✅ {student_name} marked Present for {subject} by {teacher_name}.")
-    else:
-        print(f"ℹ️ {student_name} already marked for {subject} today.")
+    with database.connection() as conn:
+        cursor = conn.cursor()
+        ids = attendance_db.student_ids(cursor)
+        subject_id = attendance_db.subject_id(cursor, subject)
+        teacher_id = attendance_db.user_id(cursor, teacher_name)
+    return ids, subject_id, teacher_id
+
+
+def mark_attendance_bulk(student_names, subject, teacher_name, date):
+    """
+    Mark a whole set of recognized students Present in one transaction.
+    Students already marked Present for this subject and date are left alone.
+    """
+    ids, subject_id, teacher_id = lookup_ids(subject, teacher_name)
+    names = sorted(name for name in set(student_names) if name in ids)
+    for name in set(student_names) - set(names):
+        print(f"⚠️ {name} has no student account, not marked.")
+
+    with database.connection() as conn:
+        changed = attendance_db.upsert_attendance(
+            conn.cursor(), [(ids[name], None, date, subject_id, teacher_id, "Present") for name in names])
 
-    conn.close()
+    print(f"✅ {changed} student(s) marked Present for {subject} on {date} "
+          f"({len(names) - changed} already marked).")
+    return changed
 
 
-def start_face_recognition(subject, teacher_name):
+def start_face_recognition(subject, teacher_name, detector=DEFAULT_DETECTOR):
     """
     Start webcam and recognize multiple students for a given subject and teacher.
     Marks attendance per subject per day.
@@ -55,6 +65,22 @@ def start_face_recognition(subject, teacher_name):
         print("❌ No student images found in 'student_images' folder.")
         return
 
+    try:
+        create_detector(detector)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {str(e)}")
+        return
+
+    gallery = FaceGallery(STUDENT_IMAGES_DIR, detector=detector).load()
+    if len(gallery) == 0:
+        print("❌ Could not embed any student images.")
+        return
+
+    # Gallery entries are mapped to student IDs once, not per recognition
+    student_ids, subject_id, teacher_id = lookup_ids(subject, teacher_name)
+    for name in sorted(set(gallery.names) - set(student_ids)):
+        print(f"⚠️ {name} has no student account and will not be marked.")
+
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
         print("❌ Could not open webcam.")
@@ -62,57 +88,104 @@ def start_face_recognition(subject, teacher_name):
 
     print(f"📷 Face recognition started for '{subject}' (Teacher: {teacher_name}) — press 'q' to quit.")
 
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    writer = AttendanceWriter().start()
     last_marked = {}
+    tracker = FaceTracker()
+    scheduler = DetectionScheduler()
+    state_lock = threading.Lock()
+    local = threading.local()
+
+    def recognize_frame(frame_id, frame):
+        """Detect, track and recognize one frame; runs on a worker thread."""
+        # Detectors are not thread-safe, so each worker keeps its own
+        if not hasattr(local, "face_detector"):
+            local.face_detector = create_detector(detector)
+
+        # Between detections the display keeps showing the current tracks
+        if not scheduler.should_detect(frame_id, frame):
+            return None
+        faces = scheduler.detect(frame, local.face_detector.detect)
+
+        with state_lock:
+            # A newer frame has already moved the tracks on
+            if frame_id < tracker.last_frame_id:
+                return None
+            tracks = tracker.update(faces, frame_id)
+            to_identify = [track for track in tracks if tracker.needs_identity(track, frame_id)]
+            for track in to_identify:
+                track.pending = True
+
+        # Only new or re-verified tracks are embedded, as one batch
+        crops = [frame[y:y + h, x:x + w] for (x, y, w, h) in (t.box for t in to_identify)]
+        # A box scaled back from a downscaled frame can fall outside it
+        empty = [track for track, crop in zip(to_identify, crops) if not crop.size]
+        if empty:
+            with state_lock:
+                for track in empty:
+                    track.pending = False
+            to_identify = [track for track, crop in zip(to_identify, crops) if crop.size]
+            crops = [crop for crop in crops if crop.size]
+        try:
+            matches = gallery.match_many(gallery.embed(crops))
+        except Exception:
+            with state_lock:
+                for track in to_identify:
+                    track.pending = False
+            raise
+
+        now = time.time()
+        to_mark = []
+        with state_lock:
+            for track, (name, _) in zip(to_identify, matches):
+                tracker.set_identity(track, name, frame_id)
+                if name not in student_ids:
+                    continue
+                if name not in last_marked or (now - last_marked[name]) > 30:
+                    last_marked[name] = now
+                    to_mark.append(name)
+            annotations = [(track.box, track.name) for track in tracks]
+
+        # Marks are written behind the video thread, in grouped transactions
+        for name in to_mark:
+            future = writer.submit(student_ids[name], subject_id, teacher_id)
+            future.add_done_callback(lambda f, name=name: report_mark(f, name))
+        return annotations
+
+    def report_mark(future, name):
+        if future.exception() is not None:
+            return
+        if future.result():
+            print(f"✅ {name} marked Present for {subject} by {teacher_name}.")
+        else:
+            print(f"ℹ️ {name} already marked for {subject} today.")
+
+    pipeline = FramePipeline(cap, recognize_frame).start()
+    window_title = f"Face Attendance - {subject} ({teacher_name})"
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        frame, annotations = pipeline.next_frame()
+        if frame is None:
             break
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
-
-        for (x, y, w, h) in faces:
-            face_crop = frame[y:y + h, x:x + w]
-            cv2.imwrite(TEMP_IMAGE, face_crop)
-
-            try:
-                result = DeepFace.find(
-                    img_path=TEMP_IMAGE,
-                    db_path=STUDENT_IMAGES_DIR,
-                    enforce_detection=False,
-                    silent=True
-                )
-
-                if len(result) > 0 and len(result[0]) > 0:
-                    match_path = result[0].iloc[0]['identity']
-                    name = os.path.basename(match_path).split('.')[0]
-
-                    now = time.time()
-                    if name not in last_marked or (now - last_marked[name]) > 30:
-                        mark_attendance(name, subject, teacher_name)
-                        last_marked[name] = now
-
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                    cv2.putText(frame, f"{name}", (x, y - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                else:
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-                    cv2.putText(frame, "Unknown", (x, y - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-            except Exception as e:
-                print(f"⚠️ Error: {str(e)}")
-
-        window_title = f"Face Attendance - {subject} ({teacher_name})"
+        for (x, y, w, h), name in annotations:
+            if name is not None:
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                cv2.putText(frame, f"{name}", (x, y - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+            else:
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
+                cv2.putText(frame, "Unknown", (x, y - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+
         cv2.imshow(window_title, frame)
         if cv2.waitKey(1) & 0xFF == ord("q"):
             break
 
+    # Workers may still be submitting marks; the writer closes after them
+    pipeline.stop()
+    writer.close()
     cap.release()
     cv2.destroyAllWindows()
-    if os.path.exists(TEMP_IMAGE):
-        os.remove(TEMP_IMAGE)
 
     print("👋 Face recognition closed.")
 
@@ -120,8 +193,10 @@ def start_face_recognition(subject, teacher_name):
 # ------------------- ENTRY POINT -------------------
 if __name__ == "__main__":
     if len(sys.argv) < 3:
-        print("❌ Usage: python face_module.py <subject> <teacher_name>")
+        print("❌ Usage: python face_module.py <subject> <teacher_name> [detector]")
     else:
         subject = sys.argv[1]
         teacher_name = sys.argv[2]
-        start_face_recognition(subject, teacher_name)
+        detector = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_DETECTOR
+        init_databases()
+        start_face_recognition(subject, teacher_name, detector)
@@ -0,0 +1,94 @@
+# face_tracker.py
+import itertools
+
+
+def iou(box_a, box_b):
+    """Intersection-over-union of two (x, y, w, h) boxes."""
+    ax, ay, aw, ah = box_a
+    bx, by, bw, bh = box_b
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+class Track:
+    """One face followed across frames."""
+
+    def __init__(self, track_id, box, frame_id):
+        self.id = track_id
+        self.box = box
+        self.name = None
+        self.last_seen = frame_id
+        self.misses = 0             # detection passes since the face was last seen
+        self.verified_at = None     # frame of the last identity check
+        self.pending = False        # identity check in progress on a worker
+
+
+class FaceTracker:
+    """
+    Lightweight IoU tracker for detector boxes.
+    Each face gets a track ID; identity is only computed when a track
+    starts and re-verified every `reverify_every` frames after that.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=5, reverify_every=30):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.reverify_every = reverify_every
+        self.tracks = []
+        self.last_frame_id = -1
+        self.next_id = itertools.count(1)
+
+    def update(self, boxes, frame_id):
+        """
+        Match this frame's boxes to existing tracks (greedy, highest IoU first).
+        Returns the track for each box, in the same order as `boxes`.
+        """
+        self.last_frame_id = max(self.last_frame_id, frame_id)
+
+        pairs = []
+        for b, box in enumerate(boxes):
+            for t, track in enumerate(self.tracks):
+                overlap = iou(box, track.box)
+                if overlap >= self.iou_threshold:
+                    pairs.append((overlap, b, t))
+        pairs.sort(reverse=True)
+
+        assigned = [None] * len(boxes)
+        used_tracks = set()
+        for _, b, t in pairs:
+            if assigned[b] is None and t not in used_tracks:
+                assigned[b] = self.tracks[t]
+                used_tracks.add(t)
+
+        for b, box in enumerate(boxes):
+            if assigned[b] is None:
+                track = Track(next(self.next_id), box, frame_id)
+                self.tracks.append(track)
+                assigned[b] = track
+            else:
+                assigned[b].box = box
+                assigned[b].last_seen = frame_id
+                assigned[b].misses = 0
+
+        # Forget faces that have not been detected for `max_missed` passes.
+        # Counted per detection pass, not per frame, since detection may skip frames.
+        for t, track in enumerate(self.tracks):
+            if t not in used_tracks and track.last_seen != frame_id:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_missed]
+        return assigned
+
+    def needs_identity(self, track, frame_id):
+        """True if the track has never been recognized or is due for re-verification."""
+        if track.pending:
+            return False
+        return track.verified_at is None or frame_id - track.verified_at >= self.reverify_every
+
+    def set_identity(self, track, name, frame_id):
+        track.name = name
+        track.verified_at = frame_id
+        track.pending = False
@@ -0,0 +1,127 @@
+# frame_pipeline.py
+import os
+import queue
+import threading
+
+
+def put_latest(q, item):
+    """Put an item on a bounded queue, dropping the oldest entry if it is full."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def default_worker_count():
+    """Leave one core each for the capture and display threads."""
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+class FramePipeline:
+    """
+    Capture -> recognition workers -> display, joined by bounded queues.
+
+    The capture thread reads frames as fast as the camera delivers them.
+    Workers run `process_frame(frame_id, frame)` and publish the annotations
+    it returns; returning None marks the frame as stale and publishes nothing.
+    The display side (the caller's thread, because cv2.imshow must run there)
+    always gets the newest raw frame plus the newest finished annotations,
+    so preview latency does not depend on recognition cost.
+    Stale frames are dropped whenever the workers fall behind.
+    """
+
+    def __init__(self, capture, process_frame, workers=None):
+        self.capture = capture
+        self.process_frame = process_frame
+        self.workers = workers or default_worker_count()
+
+        self.work_queue = queue.Queue(maxsize=self.workers)
+        self.display_queue = queue.Queue(maxsize=1)
+
+        self.lock = threading.Lock()
+        self.annotations = []
+        self.annotated_frame_id = -1
+
+        self.stopped = threading.Event()
+        self.capture_thread = None
+        self.threads = []
+
+    # -------------------- LIFECYCLE --------------------
+    def start(self):
+        self.capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
+        self.threads = [threading.Thread(target=self.worker_loop, daemon=True)
+                        for _ in range(self.workers)]
+        self.capture_thread.start()
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop capturing and wait for the workers to finish the frame they are
+        on, so anything they hand off (e.g. attendance marks) has been handed
+        off before this returns.
+        """
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join()
+        # A camera read can block; the capture thread hands nothing off
+        self.capture_thread.join(timeout=2)
+
+    # -------------------- CAPTURE --------------------
+    def capture_loop(self):
+        frame_id = 0
+        while not self.stopped.is_set():
+            ret, frame = self.capture.read()
+            if not ret:
+                break
+            put_latest(self.work_queue, (frame_id, frame))
+            put_latest(self.display_queue, frame)
+            frame_id += 1
+        self.stopped.set()
+
+    # -------------------- WORKERS --------------------
+    def worker_loop(self):
+        while not self.stopped.is_set():
+            try:
+                frame_id, frame = self.work_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                annotations = self.process_frame(frame_id, frame)
+            except Exception as e:
+                print(f"⚠️ Error: {str(e)}")
+                continue
+            if annotations is None:
+                continue
+
+            with self.lock:
+                # A slower worker must not overwrite newer results
+                if frame_id > self.annotated_frame_id:
+                    self.annotated_frame_id = frame_id
+                    self.annotations = annotations
+
+    # -------------------- DISPLAY --------------------
+    def next_frame(self, timeout=1.0):
+        """
+        Return (frame, annotations) for the newest captured frame,
+        or (None, None) once the capture has ended.
+        """
+        while True:
+            try:
+                frame = self.display_queue.get(timeout=timeout)
+                break
+            except queue.Empty:
+                if self.stopped.is_set():
+                    return None, None
+
+        with self.lock:
+            annotations = list(self.annotations)
+        # Workers may still be reading this frame; draw on a copy
+        return frame.copy(), annotations
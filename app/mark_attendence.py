@@ -1,4 +1,3 @@
-import sqlite3
 from datetime import datetime
 import subprocess
 import sys
@@ -10,7 +9,11 @@ from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 
 import global_state
-from db__initializer import init_databases
+from db__initializer import ensure_databases
+import attendance_db
+import database
+from change_tracker import ChangeTracker
+from data_service import DataService
 
 
 class MarkAttendanceWindow(QWidget):
@@ -20,7 +23,7 @@ class MarkAttendanceWindow(QWidget):
         self.setGeometry(200, 80, 900, 750)
 
         # Ensure databases exist
-        init_databases()
+        ensure_databases()
 
         self.setStyleSheet("""
             QWidget {
@@ -71,8 +74,13 @@ class MarkAttendanceWindow(QWidget):
             }
         """)
 
-        self.known_students = self.fetch_students()
+        self.known_students = []
+        self.service = DataService(self)
+        # Statuses stored for tracked_key = (date, subject), to save only edits
+        self.tracker = ChangeTracker()
+        self.tracked_key = None
         self.initUI()
+        self.fetch_students()
 
     # -------------------- UI SETUP --------------------
     def initUI(self):
@@ -115,17 +123,13 @@ class MarkAttendanceWindow(QWidget):
         scroll.setWidgetResizable(True)
         scroll_card = QWidget()
         scroll_card.setObjectName("scrollCard")
-        scroll_layout = QVBoxLayout(scroll_card)
-        scroll_layout.setSpacing(6)
+        self.scroll_layout = QVBoxLayout(scroll_card)
+        self.scroll_layout.setSpacing(6)
 
+        # Filled in by show_students once the student list has loaded
         self.checkboxes = {}
-        if not self.known_students:
-            scroll_layout.addWidget(QLabel("❌ No students found in database."))
-        else:
-            for roll, student in enumerate(self.known_students, start=1):
-                checkbox = QCheckBox(f"{roll:02d}. {student}")
-                scroll_layout.addWidget(checkbox)
-                self.checkboxes[student.lower()] = checkbox
+        self.loading_label = QLabel("⏳ Loading students...")
+        self.scroll_layout.addWidget(self.loading_label)
 
         scroll.setWidget(scroll_card)
         scroll.setMinimumHeight(400)
@@ -162,16 +166,27 @@ class MarkAttendanceWindow(QWidget):
 
     # -------------------- FETCH STUDENTS --------------------
     def fetch_students(self):
-        try:
-            conn = sqlite3.connect("logindata.db")
-            cur = conn.cursor()
-            cur.execute("SELECT username FROM users WHERE role='Student'")
-            students = [row[0] for row in cur.fetchall()]
-            conn.close()
-            return students
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
-            return []
+        """Read the student list in the background; show_students builds the checkboxes."""
+        def work(conn):
+            return conn.execute(
+                "SELECT id, username FROM users WHERE role='Student' AND active=1"
+            ).fetchall()
+
+        self.service.run("students", work, self.show_students, self.show_error)
+
+    def show_students(self, students):
+        self.known_students = students
+        self.loading_label.deleteLater()
+
+        if not self.known_students:
+            self.scroll_layout.addWidget(QLabel("❌ No students found in database."))
+        for roll, (student_id, student) in enumerate(self.known_students, start=1):
+            checkbox = QCheckBox(f"{roll:02d}. {student}")
+            self.scroll_layout.addWidget(checkbox)
+            self.checkboxes[student_id] = checkbox
+
+    def show_error(self, error):
+        QMessageBox.critical(self, "Error", f"Database error: {str(error)}")
 
     # -------------------- OPEN FACE RECOGNITION --------------------
     def open_face_recognition(self):
@@ -201,24 +216,48 @@ class MarkAttendanceWindow(QWidget):
         teacher_name = global_state.current_teacher or "Unknown Teacher"
 
         try:
-            conn = sqlite3.connect("attendance.db")
-            cur = conn.cursor()
-            date = datetime.now().strftime('%Y-%m-%d')
-
-            for roll, student_name in enumerate(self.known_students, start=1):
-                checkbox = self.checkboxes.get(student_name.lower())
-                if checkbox:
-                    status = "Present" if checkbox.isChecked() else "Absent"
-                    cur.execute("""
-                        INSERT INTO attendance (student_name, roll_number, date, subject, teacher_name, status)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (student_name, roll, date, subject, teacher_name, status))
-
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Saved", "✅ Attendance saved successfully!")
+            with database.connection() as conn:
+                cur = conn.cursor()
+                date = datetime.now().strftime('%Y-%m-%d')
+                if self.tracked_key != (date, subject):
+                    self.load_saved_statuses(cur, date, subject)
+
+                # Only students whose checkbox differs from the stored status are written
+                changes = self.tracker.changes(self.current_statuses())
+                subject_id = attendance_db.subject_id(cur, subject)
+                teacher_id = attendance_db.user_id(cur, teacher_name)
+                rows = [
+                    (student_id, roll, date, subject_id, teacher_id, changes[student_id])
+                    for roll, (student_id, _) in enumerate(self.known_students, start=1)
+                    if student_id in changes
+                ]
+                # Saving again updates today's rows instead of adding duplicates
+                changed = attendance_db.upsert_attendance(cur, rows)
+            self.tracker.mark_saved(changes)
+            QMessageBox.information(self, "Saved", f"✅ Attendance saved ({changed} change(s)).")
+            return changed
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
+            return 0
+
+    def current_statuses(self):
+        return {student_id: "Present" if checkbox.isChecked() else "Absent"
+                for student_id, checkbox in self.checkboxes.items()}
+
+    @staticmethod
+    def saved_statuses(cur, date, subject):
+        """[(student_id, status), ...] stored for a date and subject."""
+        cur.execute("""
+            SELECT a.student_id, a.status FROM attendance a
+            JOIN subjects sub ON sub.id = a.subject_id
+            WHERE a.date=? AND sub.name=?
+        """, (date, subject))
+        return cur.fetchall()
+
+    def load_saved_statuses(self, cur, date, subject):
+        """Read the stored statuses for a date and subject into the change tracker."""
+        self.tracker.load(self.saved_statuses(cur, date, subject))
+        self.tracked_key = (date, subject)
 
     # -------------------- REFRESH --------------------
     def refresh_attendance(self):
@@ -228,27 +267,33 @@ class MarkAttendanceWindow(QWidget):
             return
 
         date = datetime.now().strftime('%Y-%m-%d')
-        try:
-            conn = sqlite3.connect("attendance.db")
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT student_name, status FROM attendance WHERE date=? AND subject=?",
-                (date, subject)
-            )
-            records = cur.fetchall()
-            conn.close()
 
-            for name, status in records:
-                name = name.lower()
-                if name in self.checkboxes:
-                    self.checkboxes[name].setChecked(status == "Present")
+        def work(conn):
+            return self.saved_statuses(conn.cursor(), date, subject)
 
-            QMessageBox.information(self, "Refreshed", f"🔄 Attendance loaded for {subject}.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to refresh:\n{str(e)}")
+        self.service.run("refresh", work,
+                         lambda rows: self.show_refreshed(rows, date, subject),
+                         self.refresh_failed)
+
+    def show_refreshed(self, rows, date, subject):
+        self.tracker.load(rows)
+        self.tracked_key = (date, subject)
+
+        for student_id, status in self.tracker.saved.items():
+            if student_id in self.checkboxes:
+                self.checkboxes[student_id].setChecked(status == "Present")
+
+        QMessageBox.information(self, "Refreshed", f"🔄 Attendance loaded for {subject}.")
+
+    def refresh_failed(self, error):
+        QMessageBox.critical(self, "Error", f"Failed to refresh:\n{str(error)}")
 
     # -------------------- MARK ALL PRESENT --------------------
     def mark_all_present(self):
         for checkbox in self.checkboxes.values():
             checkbox.setChecked(True)
         QMessageBox.information(self, "Marked", "✅ All students marked as Present.")
+
+    def closeEvent(self, event):
+        self.service.cancel()
+        super().closeEvent(event)
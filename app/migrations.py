@@ -0,0 +1,61 @@
+# migrations.py
+import os
+import sqlite3
+
+
+def column_names(cur, table):
+    cur.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cur.fetchall()]
+
+
+def add_column_if_missing(cur, table, column, declaration):
+    """Older databases were created by hand; only add what they lack."""
+    if column not in column_names(cur, table):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def schema_version(db_path):
+    """Number of migrations applied to a database; 0 if it does not exist yet."""
+    if not os.path.exists(db_path):
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def migrate(db_path, migrations, attach=None):
+    """
+    Bring a database up to date with its list of migrations.
+
+    `migrations` is an ordered list of functions taking a cursor. The number
+    of migrations already applied is kept in PRAGMA user_version, so each
+    one runs exactly once per database, in its own transaction. Migrations
+    must tolerate pre-existing tables, because databases created before
+    the runner existed start at version 0.
+    `attach` maps schema names to other database files the migrations read;
+    SQLite only allows ATTACH outside a transaction, so it is done up front.
+    """
+    conn = sqlite3.connect(db_path)
+    for alias, path in (attach or {}).items():
+        conn.execute("ATTACH DATABASE ? AS " + alias, (path,))
+    # Let the migration control transactions, including DDL
+    conn.isolation_level = None
+    cur = conn.cursor()
+    try:
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(migrations, start=1):
+            if number <= version:
+                continue
+            cur.execute("BEGIN")
+            try:
+                migration(cur)
+                cur.execute(f"PRAGMA user_version = {number}")
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            print(f"🟢 {db_path}: applied migration {number} ({migration.__name__}).")
+    finally:
+        conn.close()
@@ -0,0 +1,116 @@
+# query_table_model.py
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from data_service import DataService
+
+# Rows read each time the view scrolls near the end
+PAGE_SIZE = 200
+
+
+def fetch_page(sql, params, key, after):
+    """
+    Work for the data service: the page of the query's rows that comes
+    after the key values `after` (or the first page), newest first.
+    """
+    def work(conn):
+        page_sql, page_params = sql, params
+        if after is not None:
+            page_sql += f" AND ({', '.join(key)}) < ({', '.join('?' * len(key))})"
+            page_params += tuple(after)
+        order = ", ".join(f"{column} DESC" for column in key)
+        cursor = conn.execute(f"{page_sql} ORDER BY {order} LIMIT {PAGE_SIZE}", page_params)
+        return cursor.fetchall()
+    return work
+
+
+class QueryTableModel(QAbstractTableModel):
+    """
+    Read-only table model over a SQL query, for a QTableView.
+
+    Rows are read one page at a time as the view asks for them through
+    canFetchMore/fetchMore, so showing a long history costs one tuple per
+    row actually scrolled to instead of a QTableWidgetItem per cell of
+    every row. Pages are queried on the data service's pool threads, and
+    a new query supersedes any page of the old one still being read.
+
+    Pages are keyset-paged on `key`, a unique ordering such as
+    ("a.date", "a.id"): each page continues below the key of the last row
+    read, so it is one index seek however far down the view is, and rows
+    added meanwhile cannot shift later pages. The query passed to
+    set_query must have a WHERE clause and no ORDER BY, and its select
+    list must end with the key columns; they are not shown.
+    """
+
+    def __init__(self, headers, key, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.key = key
+        self.rows = []
+        self.sql = None
+        self.params = ()
+        self.exhausted = True
+        self.service = DataService(self)
+        self.on_error = None
+
+    def set_query(self, sql, params=(), on_error=None):
+        """Replace the model's rows with the results of a new query."""
+        # Pages of the previous query are no longer wanted, even if in flight
+        self.service.cancel("page")
+        self.beginResetModel()
+        self.rows = []
+        self.sql = sql
+        self.params = tuple(params)
+        self.exhausted = False
+        self.on_error = on_error
+        self.endResetModel()
+        # Show the first page right away rather than on the view's first paint
+        self.fetchMore()
+
+    def close(self):
+        self.service.cancel()
+
+    # -------------------- LAZY LOADING --------------------
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and not self.service.is_busy("page")
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after = self.rows[-1][-len(self.key):] if self.rows else None
+        self.service.run("page", fetch_page(self.sql, self.params, self.key, after),
+                         self.add_page, self.page_failed)
+
+    def add_page(self, page):
+        if len(page) < PAGE_SIZE:
+            self.exhausted = True
+        if page:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def page_failed(self, error):
+        self.exhausted = True
+        if self.on_error is not None:
+            self.on_error(error)
+
+    # -------------------- MODEL INTERFACE --------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return str(self.rows[index.row()][index.column()])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
@@ -1,4 +1,4 @@
-import sqlite3
+import subprocess
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QComboBox, QMessageBox
@@ -6,6 +6,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 import sys
+from db__initializer import ensure_databases
+import database
 
 
 class RegisterWindow(QWidget):
@@ -13,6 +15,10 @@ class RegisterWindow(QWidget):
         super().__init__()
         self.setWindowTitle("Attendance App - Register")
         self.setGeometry(200, 50, 850, 1000)
+
+        # Ensure the users table is on the latest schema (user_id column)
+        ensure_databases()
+
         self.setStyleSheet("""
             QWidget {
                 background-color: #f8f9fa;
@@ -115,32 +121,55 @@ class RegisterWindow(QWidget):
             return
 
         try:
-            conn = sqlite3.connect("logindata.db")
-            cur = conn.cursor()
-
-            # Ensure table has the new column before insert
-            cur.execute("PRAGMA table_info(users)")
-            columns = [col[1] for col in cur.fetchall()]
-            if "user_id" not in columns:
-                cur.execute("ALTER TABLE users ADD COLUMN user_id TEXT")
-
-            cur.execute("SELECT * FROM users WHERE username=?", (username,))
-            if cur.fetchone():
-                self.message.setText("⚠️ Username already exists.")
-                conn.close()
-                return
-
-            cur.execute("INSERT INTO users (username, password, role, user_id) VALUES (?, ?, ?, ?)",
-                        (username, password, role, user_id))
-            conn.commit()
-            conn.close()
+            with database.connection() as conn:
+                cur = conn.cursor()
+
+                cur.execute("SELECT id, role, active FROM users WHERE username=?", (username,))
+                existing = cur.fetchone()
+                if existing and (existing[2] or existing[1] != role):
+                    self.message.setText("⚠️ Username already exists.")
+                    return
+
+                if existing:
+                    # An inactive placeholder kept for imported history: the
+                    # person it stands for takes it over, history included
+                    cur.execute(
+                        "UPDATE users SET password=?, user_id=?, active=1 WHERE id=?",
+                        (password, user_id, existing[0])
+                    )
+                    if role == "Student":
+                        # Its ID is below the student_status sync mark
+                        cur.execute("""
+                            INSERT OR IGNORE INTO student_status (student_id, roll_number)
+                            SELECT id, roll_number FROM users WHERE id=?
+                        """, (existing[0],))
+                else:
+                    cur.execute("INSERT INTO users (username, password, role, user_id) VALUES (?, ?, ?, ?)",
+                                (username, password, role, user_id))
 
             QMessageBox.information(self, "Registration Successful", "Account created successfully!")
+            if role == "Student":
+                self.offer_face_enrollment(username)
             self.close()
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
 
+    def offer_face_enrollment(self, username):
+        """Let a new student capture face photos for recognition right away."""
+        reply = QMessageBox.question(
+            self, "Face Enrollment",
+            "Capture face photos now so this student can be recognized?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        try:
+            subprocess.Popen([sys.executable, "enroll.py", username])
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open enrollment window:\n{str(e)}")
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,62 @@
+# startup_benchmark.py
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Constants
+HISTORY_FILE = "startup_history.csv"
+
+
+def time_launch(command):
+    """Seconds from starting `command` until the login form has been shown and closed."""
+    env = dict(os.environ, ATTENDANCE_STARTUP_BENCHMARK="1")
+    start = time.perf_counter()
+    subprocess.run(command, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def record(history_file, target, timings):
+    """Append one summary line so startup time can be tracked across changes."""
+    is_new = not os.path.exists(history_file)
+    with open(history_file, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if is_new:
+            writer.writerow(["timestamp", "target", "runs", "median_s", "min_s", "max_s"])
+        writer.writerow([
+            datetime.now().isoformat(timespec="seconds"), target, len(timings),
+            f"{statistics.median(timings):.3f}", f"{min(timings):.3f}", f"{max(timings):.3f}",
+        ])
+
+
+# ------------------- ENTRY POINT -------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time how long the app takes to show the login form."
+    )
+    parser.add_argument("--exe", help="time a PyInstaller build instead of 'python login.py'")
+    parser.add_argument("--runs", type=int, default=5, help="launches to time (default: 5)")
+    parser.add_argument("--record", action="store_true",
+                        help=f"append the result to {HISTORY_FILE}")
+    args = parser.parse_args()
+
+    command = [args.exe] if args.exe else [sys.executable, "login.py"]
+    target = args.exe or "login.py"
+
+    # The first launch warms the OS file cache and creates the database
+    time_launch(command)
+    timings = []
+    for run in range(1, args.runs + 1):
+        timings.append(time_launch(command))
+        print(f"⏱️ Run {run}: {timings[-1]:.3f}s")
+
+    print(f"✅ {target}: median {statistics.median(timings):.3f}s "
+          f"(min {min(timings):.3f}s, max {max(timings):.3f}s) over {len(timings)} runs")
+    if args.record:
+        record(HISTORY_FILE, target, timings)
+        print(f"📝 Recorded in {HISTORY_FILE}")
@@ -5,9 +5,6 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
-from student_view_attendance import StudentViewAttendance
-from student_view_status import StudentViewStatus
-
 
 class StudentDashboard(QWidget):
     def __init__(self, username):
@@ -102,10 +99,13 @@ class StudentDashboard(QWidget):
 
     # ---------------- BUTTON ACTIONS ----------------
     def open_attendance(self):
+        # Pages are imported on first use to keep login fast
+        from student_view_attendance import StudentViewAttendance
         self.attendance_window = StudentViewAttendance(self.username)
         self.attendance_window.show()
 
     def open_status(self):
+        from student_view_status import StudentViewStatus
         self.status_window = StudentViewStatus(self.username)
         self.status_window.show()
 
@@ -123,6 +123,8 @@ class StudentDashboard(QWidget):
 
 # ---------------- RUN DIRECTLY ----------------
 if __name__ == "__main__":
+    from db__initializer import ensure_databases
+    ensure_databases()
     app = QApplication(sys.argv)
     window = StudentDashboard("Ujjwal")
     window.show()
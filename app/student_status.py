@@ -1,11 +1,13 @@
-import sqlite3
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QHBoxLayout,
     QCheckBox, QPushButton, QScrollArea, QMessageBox
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
-from db__initializer import init_databases
+from db__initializer import ensure_databases
+import database
+from change_tracker import ChangeTracker
+from data_service import DataService
 
 
 class StudentStatusWindow(QWidget):
@@ -15,11 +17,7 @@ class StudentStatusWindow(QWidget):
         self.setGeometry(250, 80, 800, 700)
 
         # Ensure DBs are initialized
-        init_databases()
-
-        # Fetch or sync data
-        self.sync_students()
-        self.students = self.fetch_student_status()
+        ensure_databases()
 
         self.setStyleSheet("""
             QWidget {
@@ -60,46 +58,60 @@ class StudentStatusWindow(QWidget):
             }
         """)
 
+        self.students = []
+        self.service = DataService(self)
         self.initUI()
+        self.load_students()
 
-    # -------------------- SYNC STUDENTS --------------------
-    def sync_students(self):
-        """Ensure every student from logindata.db exists in studentstatus.db."""
-        try:
-            conn_main = sqlite3.connect("logindata.db")
-            cur_main = conn_main.cursor()
-            cur_main.execute("SELECT username FROM users WHERE role='Student'")
-            students = [s[0] for s in cur_main.fetchall()]
-            conn_main.close()
-
-            conn_status = sqlite3.connect("studentstatus.db")
-            cur_status = conn_status.cursor()
+    # -------------------- LOAD --------------------
+    def load_students(self):
+        """Sync and read student statuses in the background; show_students builds the rows."""
+        def work(conn):
+            self.sync_students(conn)
+            return self.fetch_student_status(conn)
 
-            for name in students:
-                cur_status.execute("SELECT id FROM student_status WHERE student_name=?", (name,))
-                if not cur_status.fetchone():
-                    cur_status.execute(
-                        "INSERT INTO student_status (student_name) VALUES (?)", (name,)
-                    )
+        self.service.run("students", work, self.show_students, self.show_error)
 
-            conn_status.commit()
-            conn_status.close()
+    def show_error(self, error):
+        QMessageBox.critical(self, "Error", f"Database error: {str(error)}")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to sync students:\n{str(e)}")
+    # -------------------- SYNC STUDENTS --------------------
+    def sync_students(self, conn):
+        """
+        Give every student account added since the last sync a student_status
+        row. users.id only grows, so the highest ID already synced is kept in
+        sync_state and older accounts are never looked at again.
+        """
+        with conn:
+            cur = conn.cursor()
+            cur.execute("SELECT last_id FROM sync_state WHERE name='student_status'")
+            row = cur.fetchone()
+            last_id = row[0] if row else 0
+
+            cur.execute("""
+                INSERT INTO student_status (student_id, roll_number)
+                SELECT u.id, u.roll_number FROM users u
+                WHERE u.role='Student' AND u.active=1 AND u.id > ?
+                  AND NOT EXISTS (SELECT 1 FROM student_status st WHERE st.student_id = u.id)
+            """, (last_id,))
+            cur.execute("""
+                INSERT INTO sync_state (name, last_id)
+                SELECT 'student_status', COALESCE(MAX(id), 0) FROM users WHERE id > ?
+                ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id
+                WHERE excluded.last_id > sync_state.last_id
+            """, (last_id,))
 
     # -------------------- FETCH DATA --------------------
-    def fetch_student_status(self):
-        try:
-            conn = sqlite3.connect("studentstatus.db")
-            cur = conn.cursor()
-            cur.execute("SELECT student_name, got_books, got_uniform, fees_paid FROM student_status")
-            data = cur.fetchall()
-            conn.close()
-            return data
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
-            return []
+    def fetch_student_status(self, conn):
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT st.student_id, u.username, st.got_books, st.got_uniform, st.fees_paid
+            FROM student_status st
+            JOIN users u ON u.id = st.student_id
+            WHERE u.active=1
+            ORDER BY u.username
+        """)
+        return cur.fetchall()
 
     # -------------------- UI SETUP --------------------
     def initUI(self):
@@ -117,39 +129,14 @@ class StudentStatusWindow(QWidget):
         scroll.setWidgetResizable(True)
         scroll_card = QWidget()
         scroll_card.setObjectName("scrollCard")
-        scroll_layout = QVBoxLayout(scroll_card)
-        scroll_layout.setSpacing(10)
+        self.scroll_layout = QVBoxLayout(scroll_card)
+        self.scroll_layout.setSpacing(10)
 
+        # Filled in by show_students once the statuses have loaded
         self.checkboxes = {}
-
-        if not self.students:
-            scroll_layout.addWidget(QLabel("❌ No student data found."))
-        else:
-            for student_name, got_books, got_uniform, fees_paid in self.students:
-                box_layout = QHBoxLayout()
-                box_layout.setSpacing(30)
-
-                name_label = QLabel(f"👤 {student_name}")
-                name_label.setFont(QFont("Segoe UI", 13, QFont.Bold))
-                name_label.setFixedWidth(200)
-
-                book_cb = QCheckBox("Books Acquired")
-                uniform_cb = QCheckBox("Uniform Acquired")
-                fees_cb = QCheckBox("Fees Paid")
-
-                # Set checkbox states
-                book_cb.setChecked(bool(got_books))
-                uniform_cb.setChecked(bool(got_uniform))
-                fees_cb.setChecked(bool(fees_paid))
-
-                self.checkboxes[student_name] = (book_cb, uniform_cb, fees_cb)
-
-                box_layout.addWidget(name_label)
-                box_layout.addWidget(book_cb)
-                box_layout.addWidget(uniform_cb)
-                box_layout.addWidget(fees_cb)
-
-                scroll_layout.addLayout(box_layout)
+        self.tracker = ChangeTracker()
+        self.loading_label = QLabel("⏳ Loading students...")
+        self.scroll_layout.addWidget(self.loading_label)
 
         scroll.setWidget(scroll_card)
 
@@ -164,30 +151,64 @@ class StudentStatusWindow(QWidget):
 
         self.setLayout(main_layout)
 
+    def show_students(self, students):
+        self.students = students
+        self.loading_label.deleteLater()
+        self.tracker.load(
+            (student_id, (int(bool(books)), int(bool(uniform)), int(bool(fees))))
+            for student_id, _, books, uniform, fees in self.students
+        )
+
+        if not self.students:
+            self.scroll_layout.addWidget(QLabel("❌ No student data found."))
+        for student_id, student_name, got_books, got_uniform, fees_paid in self.students:
+            box_layout = QHBoxLayout()
+            box_layout.setSpacing(30)
+
+            name_label = QLabel(f"👤 {student_name}")
+            name_label.setFont(QFont("Segoe UI", 13, QFont.Bold))
+            name_label.setFixedWidth(200)
+
+            book_cb = QCheckBox("Books Acquired")
+            uniform_cb = QCheckBox("Uniform Acquired")
+            fees_cb = QCheckBox("Fees Paid")
+
+            # Set checkbox states
+            book_cb.setChecked(bool(got_books))
+            uniform_cb.setChecked(bool(got_uniform))
+            fees_cb.setChecked(bool(fees_paid))
+
+            self.checkboxes[student_id] = (book_cb, uniform_cb, fees_cb)
+
+            box_layout.addWidget(name_label)
+            box_layout.addWidget(book_cb)
+            box_layout.addWidget(uniform_cb)
+            box_layout.addWidget(fees_cb)
+
+            self.scroll_layout.addLayout(box_layout)
+
     # -------------------- UPDATE STATUS --------------------
     def update_status(self):
+        """Write only the students whose checkboxes changed; returns how many."""
+        current = {
+            student_id: (int(book_cb.isChecked()), int(uniform_cb.isChecked()), int(fees_cb.isChecked()))
+            for student_id, (book_cb, uniform_cb, fees_cb) in self.checkboxes.items()
+        }
+        changes = self.tracker.changes(current)
         try:
-            conn = sqlite3.connect("studentstatus.db")
-            cur = conn.cursor()
-
-            for student_name, (book_cb, uniform_cb, fees_cb) in self.checkboxes.items():
-                cur.execute("""
+            with database.connection() as conn:
+                conn.executemany("""
                     UPDATE student_status
                     SET got_books=?, got_uniform=?, fees_paid=?
-                    WHERE student_name=?
-                """, (
-                    int(book_cb.isChecked()),
-                    int(uniform_cb.isChecked()),
-                    int(fees_cb.isChecked()),
-                    student_name
-                ))
-
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Updated", "✅ Student statuses updated successfully!")
+                    WHERE student_id=?
+                """, [(*flags, student_id) for student_id, flags in changes.items()])
+            self.tracker.mark_saved(changes)
+            QMessageBox.information(self, "Updated", f"✅ {len(changes)} student status(es) updated.")
+            return len(changes)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to update:\n{str(e)}")
+            return 0
 
 
 # -------------------- Run Directly --------------------
@@ -1,11 +1,13 @@
 # student_view_attendance.py
-import sqlite3
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QLabel, QTableView,
     QHeaderView, QMessageBox
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
+from data_service import DataService
+from attendance_db import PAGE_KEY, attendance_totals, subject_breakdown, user_id
+from query_table_model import QueryTableModel
 
 
 class StudentViewAttendance(QWidget):
@@ -31,7 +33,11 @@ class StudentViewAttendance(QWidget):
                 color: #2e7d32;
                 margin-bottom: 15px;
             }
-            QTableWidget {
+            QLabel#subjects {
+                font-size: 14px;
+                color: #0d47a1;
+            }
+            QTableView {
                 background: white;
                 border-radius: 10px;
                 border: 1px solid #ccc;
@@ -46,6 +52,7 @@ class StudentViewAttendance(QWidget):
             }
         """)
 
+        self.service = DataService(self)
         self.initUI()
 
     def initUI(self):
@@ -66,10 +73,17 @@ class StudentViewAttendance(QWidget):
         self.percentage_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.percentage_label)
 
+        # Per-subject breakdown
+        self.subjects_label = QLabel()
+        self.subjects_label.setObjectName("subjects")
+        self.subjects_label.setAlignment(Qt.AlignCenter)
+        self.subjects_label.setWordWrap(True)
+        layout.addWidget(self.subjects_label)
+
         # Table for attendance data
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Date", "Subject", "Teacher", "Status"])
+        self.model = QueryTableModel(["Date", "Subject", "Teacher", "Status"], PAGE_KEY, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(self.table)
 
@@ -79,41 +93,47 @@ class StudentViewAttendance(QWidget):
         self.load_data()
 
     def load_data(self):
-        """Load the attendance data for the current student."""
-        try:
-            conn = sqlite3.connect("attendance.db")
+        """Load the attendance data for the current student in the background."""
+        def work(conn):
             cur = conn.cursor()
-
-            cur.execute("""
-                SELECT date, subject, teacher_name, status
-                FROM attendance
-                WHERE student_name = ?
-                ORDER BY date DESC
-            """, (self.username,))
-
-            data = cur.fetchall()
-            conn.close()
-
-            if not data:
-                self.percentage_label.setText("No attendance records found.")
-                return
-
-            # Populate table
-            self.table.setRowCount(0)
-            present_count = 0
-            for row_num, row_data in enumerate(data):
-                self.table.insertRow(row_num)
-                for col_num, value in enumerate(row_data):
-                    self.table.setItem(row_num, col_num, QTableWidgetItem(str(value)))
-                if row_data[3] == "Present":
-                    present_count += 1
-
-            # Calculate percentage
-            total_classes = len(data)
-            percentage = (present_count / total_classes) * 100
-            self.percentage_label.setText(
-                f"✅ Attendance: {present_count}/{total_classes} classes ({percentage:.2f}%)"
-            )
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
+            student_id = user_id(cur, self.username)
+            # Counts come from attendance_summary; the rows themselves are
+            # only read as the table scrolls
+            return student_id, attendance_totals(cur, student_id), subject_breakdown(cur, student_id)
+
+        self.service.run("summary", work, self.show_summary, self.show_error)
+
+    def show_summary(self, result):
+        student_id, (present_count, total_classes), breakdown = result
+
+        if not total_classes:
+            self.percentage_label.setText("No attendance records found.")
+            return
+
+        self.subjects_label.setText("   •   ".join(
+            f"{subject}: {present}/{total} ({present / total * 100:.0f}%)"
+            for subject, present, total in breakdown if total
+        ))
+
+        # Newest first; the model orders and pages on (date, id)
+        self.model.set_query("""
+            SELECT a.date, sub.name, t.username, a.status, a.date, a.id
+            FROM attendance a
+            JOIN subjects sub ON sub.id = a.subject_id
+            LEFT JOIN users t ON t.id = a.teacher_id
+            WHERE a.student_id = ?
+        """, (student_id,), on_error=self.show_error)
+
+        # Calculate percentage
+        percentage = (present_count / total_classes) * 100
+        self.percentage_label.setText(
+            f"✅ Attendance: {present_count}/{total_classes} classes ({percentage:.2f}%)"
+        )
+
+    def show_error(self, error):
+        QMessageBox.critical(self, "Error", f"Database error: {str(error)}")
+
+    def closeEvent(self, event):
+        self.service.cancel()
+        self.model.close()
+        super().closeEvent(event)
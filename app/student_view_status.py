@@ -1,9 +1,9 @@
-import sqlite3
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QFrame, QMessageBox
 )
 from PyQt5.QtGui import QFont, QColor, QPalette
 from PyQt5.QtCore import Qt
+from data_service import DataService
 
 
 class StudentViewStatus(QWidget):
@@ -37,6 +37,7 @@ class StudentViewStatus(QWidget):
             }
         """)
 
+        self.service = DataService(self)
         self.initUI()
 
     # ------------------- UI SETUP -------------------
@@ -50,8 +51,31 @@ class StudentViewStatus(QWidget):
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
-        # Fetch status data
-        data = self.fetch_student_status()
+        # Filled in by show_status once the row has loaded
+        self.loading_label = QLabel("⏳ Loading status...")
+        self.loading_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.loading_label)
+
+        self.setLayout(layout)
+        self.load_status()
+
+    # ------------------- Fetch Status Data -------------------
+    def load_status(self):
+        """Read the student's status row in the background; show_status adds the cards."""
+        student_name = self.student_name
+
+        def work(conn):
+            return conn.execute("""
+                SELECT got_books, got_uniform, fees_paid
+                FROM student_status
+                WHERE student_id = (SELECT id FROM users WHERE username = ?)
+            """, (student_name,)).fetchone()
+
+        self.service.run("status", work, self.show_status, self.show_error)
+
+    def show_status(self, data):
+        layout = self.layout()
+        self.loading_label.deleteLater()
 
         if data:
             got_books, got_uniform, fees_paid = data
@@ -75,24 +99,12 @@ class StudentViewStatus(QWidget):
         else:
             layout.addWidget(QLabel("❌ No status record found for this student."))
 
-        self.setLayout(layout)
+    def show_error(self, error):
+        QMessageBox.critical(self, "Database Error", str(error))
 
-    # ------------------- Fetch Status Data -------------------
-    def fetch_student_status(self):
-        try:
-            conn = sqlite3.connect("studentstatus.db")
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT got_books, got_uniform, fees_paid
-                FROM student_status
-                WHERE student_name = ?
-            """, (self.student_name,))
-            row = cur.fetchone()
-            conn.close()
-            return row
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", str(e))
-            return None
+    def closeEvent(self, event):
+        self.service.cancel()
+        super().closeEvent(event)
 
     # ------------------- Create Card -------------------
     def create_status_card(self, title, status_value, color_active, color_inactive):
@@ -128,6 +140,8 @@ class StudentViewStatus(QWidget):
 if __name__ == "__main__":
     from PyQt5.QtWidgets import QApplication
     import sys
+    from db__initializer import ensure_databases
+    ensure_databases()
     app = QApplication(sys.argv)
     window = StudentViewStatus("Ujjwal Biswas")  # Example name
     window.show()
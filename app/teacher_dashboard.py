@@ -6,11 +6,6 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, QPoint
 
-# Import your other pages
-from mark_attendence import MarkAttendanceWindow
-from view_reports import ViewReportsWindow
-from student_status import StudentStatusWindow
-
 
 class TeacherDashboard(QWidget):
     def __init__(self, username, login_window=None):
@@ -111,6 +106,8 @@ class TeacherDashboard(QWidget):
     def open_mark_attendance(self):
         if self.mark_window is None or not self.mark_window.isVisible():
             try:
+                # Pages are imported on first use to keep login fast
+                from mark_attendence import MarkAttendanceWindow
                 self.mark_window = MarkAttendanceWindow()
                 self.mark_window.setAttribute(Qt.WA_DeleteOnClose, False)
                 self.mark_window.show()
@@ -123,6 +120,7 @@ class TeacherDashboard(QWidget):
     def open_view_reports(self):
         if self.reports_window is None or not self.reports_window.isVisible():
             try:
+                from view_reports import ViewReportsWindow
                 self.reports_window = ViewReportsWindow()
                 self.reports_window.setAttribute(Qt.WA_DeleteOnClose, False)
                 self.reports_window.show()
@@ -135,6 +133,7 @@ class TeacherDashboard(QWidget):
     def open_student_status(self):
         if self.status_window is None or not self.status_window.isVisible():
             try:
+                from student_status import StudentStatusWindow
                 self.status_window = StudentStatusWindow()
                 self.status_window.setAttribute(Qt.WA_DeleteOnClose, False)
                 self.status_window.show()
@@ -162,6 +161,8 @@ class TeacherDashboard(QWidget):
 # Run Dashboard (for testing)
 # -------------------------------
 if __name__ == "__main__":
+    from db__initializer import ensure_databases
+    ensure_databases()
     app = QApplication(sys.argv)
     window = TeacherDashboard("teacher1")
     window.show()
@@ -1,15 +1,22 @@
 # view_reports.py
-import sqlite3
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
-    QHeaderView, QMessageBox, QLineEdit, QHBoxLayout, QComboBox, QFrame, QScrollArea
+    QWidget, QVBoxLayout, QLabel, QPushButton, QTableView,
+    QHeaderView, QMessageBox, QLineEdit, QHBoxLayout, QComboBox, QFrame, QScrollArea,
+    QFileDialog, QProgressDialog, QDateEdit
 )
 from PyQt5.QtGui import QFont, QPalette, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QDate, pyqtSignal
+import threading
 import global_state
+from attendance_db import ATTENDANCE_PAGE_ROWS, PAGE_KEY, search_clause
+from data_service import DataService, export_pool
+from query_table_model import QueryTableModel
 
 
 class ViewReportsWindow(QWidget):
+    # Emitted from the pool thread while an export is being written
+    export_progress = pyqtSignal(int, int)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("📊 Attendance Reports - Teacher Panel")
@@ -28,7 +35,7 @@ class ViewReportsWindow(QWidget):
                 color: #0d47a1;
             }
 
-            QLineEdit, QComboBox {
+            QLineEdit, QComboBox, QDateEdit {
                 padding: 10px;
                 border-radius: 10px;
                 border: 1px solid #ccc;
@@ -55,7 +62,7 @@ class ViewReportsWindow(QWidget):
                 background-color: #0277bd;
             }
 
-            QTableWidget {
+            QTableView {
                 background-color: #ffffff;
                 alternate-background-color: #f1f8ff;
                 border: 1px solid #ccc;
@@ -74,6 +81,11 @@ class ViewReportsWindow(QWidget):
             }
         """)
 
+        self.analytics_window = None
+        self.export_service = DataService(self, pool=export_pool())
+        self.export_dialog = None
+        self.export_cancelled = threading.Event()
+        self.export_progress.connect(self.show_export_progress)
         self.initUI()
 
     # -------------------- UI SETUP --------------------
@@ -106,12 +118,17 @@ class ViewReportsWindow(QWidget):
             }
         """)
 
-        filter_layout = QHBoxLayout(filter_card)
+        card_layout = QVBoxLayout(filter_card)
+        card_layout.setSpacing(15)
+        filter_layout = QHBoxLayout()
         filter_layout.setSpacing(15)
         filter_layout.setAlignment(Qt.AlignCenter)
+        date_layout = QHBoxLayout()
+        date_layout.setSpacing(15)
+        date_layout.setAlignment(Qt.AlignCenter)
 
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("🔍 Search by name or date (YYYY-MM-DD)")
+        self.search_input.setPlaceholderText("🔍 Search by name, subject or date (YYYY-MM-DD)")
         self.search_input.setFixedWidth(300)
 
         self.subject_filter = QComboBox()
@@ -121,24 +138,51 @@ class ViewReportsWindow(QWidget):
         ])
         self.subject_filter.setFixedWidth(200)
 
+        # Date range for the table and for exports; "Any" leaves that end open
+        self.from_date = self.date_box()
+        self.to_date = self.date_box()
+
         search_btn = QPushButton("Search")
         refresh_btn = QPushButton("Refresh")
         refresh_btn.setObjectName("refreshBtn")
+        analytics_btn = QPushButton("📈 Analytics")
+        analytics_btn.clicked.connect(self.open_analytics)
+        export_btn = QPushButton("⬇️ Export")
+        export_btn.clicked.connect(self.export_data)
 
         search_btn.clicked.connect(self.load_filtered_data)
         refresh_btn.clicked.connect(self.load_all_data)
 
+        # Search as you type, once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.load_filtered_data)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.subject_filter.currentIndexChanged.connect(self.search_timer.start)
+        self.from_date.dateChanged.connect(self.search_timer.start)
+        self.to_date.dateChanged.connect(self.search_timer.start)
+
         filter_layout.addWidget(self.search_input)
         filter_layout.addWidget(self.subject_filter)
         filter_layout.addWidget(search_btn)
         filter_layout.addWidget(refresh_btn)
+        filter_layout.addWidget(analytics_btn)
+        filter_layout.addWidget(export_btn)
+        date_layout.addWidget(QLabel("From:"))
+        date_layout.addWidget(self.from_date)
+        date_layout.addWidget(QLabel("To:"))
+        date_layout.addWidget(self.to_date)
+        card_layout.addLayout(filter_layout)
+        card_layout.addLayout(date_layout)
 
         # Table Section
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
+        # Rows are read lazily as the table is scrolled
+        self.model = QueryTableModel([
             "Roll No", "Student Name", "Date", "Subject", "Teacher", "Status"
-        ])
+        ], PAGE_KEY, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setAlternatingRowColors(True)
         self.table.setMinimumHeight(450)
@@ -154,73 +198,140 @@ class ViewReportsWindow(QWidget):
         # Load all data initially
         self.load_all_data()
 
+    def date_box(self):
+        box = QDateEdit()
+        box.setCalendarPopup(True)
+        box.setDisplayFormat("yyyy-MM-dd")
+        box.setMinimumDate(QDate(2000, 1, 1))
+        box.setSpecialValueText("Any")
+        box.setDate(box.minimumDate())
+        box.setFixedWidth(160)
+        return box
+
+    def date_range(self):
+        """(start, end) as YYYY-MM-DD, with None for a box left at "Any"."""
+        return tuple(
+            None if box.date() == box.minimumDate() else box.date().toString("yyyy-MM-dd")
+            for box in (self.from_date, self.to_date)
+        )
+
     # -------------------- LOAD ALL --------------------
     def load_all_data(self):
         """Load all attendance records for the current teacher."""
-        try:
-            conn = sqlite3.connect("attendance.db")
-            cur = conn.cursor()
-
-            teacher_name = global_state.current_teacher or "Unknown Teacher"
-
-            cur.execute("""
-                SELECT roll_number, student_name, date, subject, teacher_name, status
-                FROM attendance
-                WHERE teacher_name = ?
-                ORDER BY date DESC
-            """, (teacher_name,))
-
-            data = cur.fetchall()
-            conn.close()
-            self.populate_table(data)
+        teacher_name = global_state.current_teacher or "Unknown Teacher"
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
+        # Newest first; the model orders and pages on (date, id)
+        self.model.set_query(ATTENDANCE_PAGE_ROWS + """
+            WHERE a.teacher_id = (SELECT id FROM users WHERE username = ?)
+        """, (teacher_name,), on_error=self.show_error)
 
     # -------------------- LOAD FILTERED --------------------
     def load_filtered_data(self):
         """Filter attendance by name/date and subject."""
+        self.search_timer.stop()
         keyword = self.search_input.text().strip()
         subject = self.subject_filter.currentText()
         teacher_name = global_state.current_teacher or "Unknown Teacher"
 
-        query = """
-            SELECT roll_number, student_name, date, subject, teacher_name, status
-            FROM attendance
-            WHERE teacher_name = ?
+        query = ATTENDANCE_PAGE_ROWS + """
+            WHERE a.teacher_id = (SELECT id FROM users WHERE username = ?)
         """
         params = [teacher_name]
 
         if keyword:
-            query += " AND (student_name LIKE ? OR date LIKE ?)"
-            params += [f"%{keyword}%", f"%{keyword}%"]
+            clause, clause_params = search_clause(keyword)
+            query += clause
+            params += clause_params
 
         if subject != "All Subjects":
-            query += " AND subject = ?"
+            query += " AND a.subject_id = (SELECT id FROM subjects WHERE name = ?)"
             params.append(subject)
 
-        query += " ORDER BY date DESC"
-
-        try:
-            conn = sqlite3.connect("attendance.db")
-            cur = conn.cursor()
-            cur.execute(query, tuple(params))
-            data = cur.fetchall()
-            conn.close()
-            self.populate_table(data)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Database error: {str(e)}")
+        start, end = self.date_range()
+        if start:
+            query += " AND a.date >= ?"
+            params.append(start)
+        if end:
+            query += " AND a.date <= ?"
+            params.append(end)
+
+        self.model.set_query(query, params, on_error=self.show_error)
+
+    def show_error(self, error):
+        QMessageBox.critical(self, "Error", f"Database error: {str(error)}")
+
+    # -------------------- ANALYTICS --------------------
+    def open_analytics(self):
+        if self.analytics_window is None or not self.analytics_window.isVisible():
+            from analytics_view import AnalyticsWindow
+            self.analytics_window = AnalyticsWindow()
+            self.analytics_window.show()
+        else:
+            self.analytics_window.load_data()
+            self.analytics_window.activateWindow()
+
+    # -------------------- EXPORT --------------------
+    def export_data(self):
+        """Export the teacher's attendance for the selected subject and dates to CSV or Parquet."""
+        if self.export_service.is_busy("export"):
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Attendance", "attendance.csv", "CSV (*.csv);;Parquet (*.parquet)"
+        )
+        if not path:
+            return
+        from export_attendance import export_attendance
+
+        start, end = self.date_range()
+        subject = self.subject_filter.currentText()
+        subject = None if subject == "All Subjects" else subject
+        teacher_name = global_state.current_teacher or "Unknown Teacher"
 
-    # -------------------- POPULATE TABLE --------------------
-    def populate_table(self, data):
-        self.table.setRowCount(0)
-        for row_num, row_data in enumerate(data):
-            self.table.insertRow(row_num)
-            for col_num, value in enumerate(row_data):
-                item = QTableWidgetItem(str(value))
-                item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row_num, col_num, item)
+        cancelled = self.export_cancelled = threading.Event()
+        self.export_dialog = QProgressDialog("Exporting attendance...", "Cancel", 0, 100, self)
+        self.export_dialog.setWindowModality(Qt.WindowModal)
+        self.export_dialog.setMinimumDuration(500)
+        self.export_dialog.canceled.connect(cancelled.set)
+
+        def progress(done, total):
+            try:
+                self.export_progress.emit(done, total)
+            except RuntimeError:
+                return False    # the window was closed
+            return not cancelled.is_set()
+
+        def work(conn):
+            # The export reads through its own connection; rows are written on the pool thread
+            return export_attendance(path, start, end, subject, teacher_name, progress=progress)
+
+        self.export_service.run("export", work,
+                         lambda count: self.export_finished(count, path), self.export_failed)
+
+    def show_export_progress(self, done, total):
+        if self.export_dialog is not None:
+            self.export_dialog.setMaximum(max(total, 1))
+            self.export_dialog.setValue(done)
+
+    def export_finished(self, count, path):
+        self.close_export_dialog()
+        if count is not None:
+            QMessageBox.information(self, "Exported", f"✅ {count} rows exported to {path}")
+
+    def export_failed(self, error):
+        self.close_export_dialog()
+        QMessageBox.critical(self, "Error", f"Export failed:\n{str(error)}")
+
+    def close_export_dialog(self):
+        if self.export_dialog is not None:
+            self.export_dialog.close()
+            self.export_dialog = None
+
+    def closeEvent(self, event):
+        # A running export stops at its next chunk and removes the partial file
+        self.export_cancelled.set()
+        self.export_service.cancel()
+        self.model.close()
+        super().closeEvent(event)
 
 
 # -------------------- Run Directly --------------------
@@ -228,9 +339,11 @@ if __name__ == "__main__":
     from PyQt5.QtWidgets import QApplication
     import sys
     import global_state
+    from db__initializer import ensure_databases
 
     # For test
     global_state.current_teacher = "DemoTeacher"
+    ensure_databases()
 
     app = QApplication(sys.argv)
     window = ViewReportsWindow()